@@ -0,0 +1,297 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+import pygame
+
+from metrics import REGISTRY
+
+
+# Every image the game knows how to load from the assets folder.
+IMAGE_KEYS = [
+    "urban_background", "ocean_background", "forest_background",
+    "tree", "plastic_bottle", "scoreboard", "correct",
+    "incorrect", "recycle_bin", "animal_habitat",
+    "game_over", "menu_background", "community_challenge", "waste"]
+
+# Full-screen art that may be stored at reduced quality to stay within the memory budget
+REDUCIBLE_KEYS = {"urban_background", "ocean_background", "forest_background", "menu_background"}
+
+ASSET_LOAD_SECONDS = REGISTRY.histogram("ecoquest_asset_load_seconds", "Time to decode an asset from disk.",
+                                        ("asset",))
+ASSET_BYTES = REGISTRY.gauge("ecoquest_asset_bytes", "Memory held by loaded assets, by kind.", ("kind",))
+ENVIRONMENT_BYTES = REGISTRY.gauge("ecoquest_asset_environment_bytes",
+                                   "Memory held by the assets each environment uses.", ("environment",))
+ASSET_PEAK_BYTES = REGISTRY.gauge("ecoquest_asset_peak_bytes", "Most memory loaded assets have held at once.")
+ASSET_BUDGET_BYTES = REGISTRY.gauge("ecoquest_asset_budget_bytes", "Asset memory budget (0: none).")
+
+
+def surface_bytes(surface):
+    """Pixel memory of a Surface."""
+    return surface.get_pitch() * surface.get_height()
+
+
+class MemoryLedger:
+    """Bytes held by loaded assets, with the peak total and an optional budget.
+
+    Caches record what they keep under a kind ("image", "sound", "variant")
+    and a name; `asset` names the image a derived surface was made from, and
+    `environments` maps image names to the environments that use them, so
+    totals can be given per environment (an image several environments use
+    counts in each, anything unmapped under "shared"). With a `budget` in
+    bytes, caches ask fits() before loading and fall back to cheaper forms.
+    """
+
+    def __init__(self, budget=0, environments=None):
+        self.budget = budget
+        self.environments = environments or {}
+        self.peak = 0
+        self._entries = {}  # (kind, name) -> (bytes, asset, quality)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        return self._total
+
+    def fits(self, nbytes):
+        """Whether nbytes more would stay within the budget."""
+        return not self.budget or self._total + nbytes <= self.budget
+
+    def add(self, kind, name, nbytes, asset=None, quality="full"):
+        with self._lock:
+            previous = self._entries.get((kind, name))
+            self._total += nbytes - (previous[0] if previous else 0)
+            self._entries[(kind, name)] = (nbytes, asset or name, quality)
+            self.peak = max(self.peak, self._total)
+        self.publish()
+
+    def remove(self, kind, name):
+        with self._lock:
+            entry = self._entries.pop((kind, name), None)
+            if entry:
+                self._total -= entry[0]
+        if entry:
+            self.publish()
+
+    def _totals(self):
+        kinds, environments = {}, {}
+        for (kind, _), (nbytes, asset, _) in self._entries.items():
+            kinds[kind] = kinds.get(kind, 0) + nbytes
+            for environment in self.environments.get(asset, ("shared",)):
+                environments[environment] = environments.get(environment, 0) + nbytes
+        return kinds, environments
+
+    def publish(self):
+        """Copy the totals to the metrics registry."""
+        with self._lock:
+            kinds, environments = self._totals()
+            peak = self.peak
+        for kind, nbytes in kinds.items():
+            ASSET_BYTES.labels(kind).set(nbytes)
+        for environment, nbytes in environments.items():
+            ENVIRONMENT_BYTES.labels(environment).set(nbytes)
+        ASSET_PEAK_BYTES.set(peak)
+        ASSET_BUDGET_BYTES.set(self.budget)
+
+    def report(self):
+        """Everything the ledger knows, as a JSON-ready dict. Safe to call from any thread."""
+        with self._lock:
+            kinds, environments = self._totals()
+            assets = [{"kind": kind, "name": name, "bytes": nbytes, "quality": quality}
+                      for (kind, name), (nbytes, _, quality) in sorted(self._entries.items())]
+            return {"budget": self.budget, "total": self._total, "peak": self.peak,
+                    "kinds": kinds, "environments": environments, "assets": assets}
+
+
+# The process-wide ledger; the game sets its budget and environment map at startup
+MEMORY = MemoryLedger()
+
+
+def timed_decode(name, load):
+    """Wrap a decode callable so its duration is recorded under the asset's name."""
+    def decode():
+        started = time.perf_counter()
+        value = load()
+        ASSET_LOAD_SECONDS.labels(name).observe(time.perf_counter() - started)
+        return value
+    return decode
+
+
+def load_in_parallel(tasks, finalize=None, on_progress=None, workers=None):
+    """Run the decode callables in `tasks` ({name: callable}) on a thread pool.
+
+    Results are passed through `finalize(name, value)` on the calling thread as
+    they complete, and `on_progress(name, done, total)` is called after each one.
+    Returns (results, errors), both keyed by name.
+    """
+    results, errors = {}, {}
+    if not tasks:
+        return results, errors
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks)), thread_name_prefix="asset-decode") as pool:
+        futures = {pool.submit(task): name for name, task in tasks.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                value = future.result()
+            except Exception as e:
+                errors[name] = e
+            else:
+                results[name] = finalize(name, value) if finalize else value
+            if on_progress:
+                on_progress(name, done, len(tasks))
+    return results, errors
+
+
+class ImageCache:
+    """Dictionary-like image store that decodes each image the first time it is needed.
+
+    Decoding (reading and unpacking the PNG) may happen on any thread through
+    prefetch(); conversion to the display format always happens on the main
+    thread in collect(), so the surfaces handed out are ready to blit.
+
+    Every surface kept is recorded in `ledger`. When a background would
+    take the ledger over its budget it is kept in 16-bit colour instead,
+    or at half resolution as well; use sized() to blit those full-screen.
+    """
+
+    def __init__(self, directory="assets", ledger=MEMORY):
+        self.directory = directory
+        self.ledger = ledger
+        self._surfaces = {}
+        self._decoded = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return f"{self.directory}/{key}.png"
+
+    def __getitem__(self, key):
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            return surface
+        self.collect()
+        if key not in self._surfaces:
+            with self._lock:
+                decoded = self._decoded.pop(key, None)
+            if decoded is None:
+                decoded = self.decode(key)
+            self._surfaces[key] = self.finalize(key, decoded)
+        return self._surfaces[key]
+
+    def __contains__(self, key):
+        return key in self._surfaces
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def sized(self, key, size):
+        """Image `key` at `size`. A background reduced for the memory budget is
+        scaled back up into a temporary surface; anything else is returned as is."""
+        surface = self[key]
+        if surface.get_size() == tuple(size):
+            return surface
+        return pygame.transform.scale(surface, size)
+
+    def decode(self, key):
+        """Read an image from disk. Safe to call off the main thread."""
+        if key not in IMAGE_KEYS:
+            raise KeyError(key)
+        try:
+            return timed_decode(key, partial(pygame.image.load, self.path(key)))()
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Failed to load image {key}: {e}")
+            raise KeyError(key) from e
+
+    def finalize(self, key, surface):
+        """Convert a decoded surface to the display format and account for it. Main thread only."""
+        quality = "full"
+        if self.ledger.budget and key in REDUCIBLE_KEYS and not surface.get_flags() & pygame.SRCALPHA:
+            surface, quality = self.reduce(surface)
+        if quality == "full" and pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+        self.ledger.add("image", key, surface_bytes(surface), quality=quality)
+        return surface
+
+    def reduce(self, surface):
+        """The first of full quality, 16-bit colour or 16-bit at half resolution
+        that fits the budget (the smallest if none does). Returns (surface, quality)."""
+        width, height = surface.get_size()
+        if self.ledger.fits(width * height * 4):
+            return surface, "full"
+        reduced = surface.convert(16)
+        if self.ledger.fits(surface_bytes(reduced)):
+            return reduced, "16-bit"
+        if surface.get_bitsize() < 24:  # smoothscale needs true colour
+            surface = surface.convert(32)
+        half = pygame.transform.smoothscale(surface, (max(1, width // 2), max(1, height // 2)))
+        return half.convert(16), "16-bit half"
+
+    def load_all(self, keys, on_progress=None, workers=None):
+        """Decode keys in parallel and convert them here, reporting progress per image."""
+        keys = [key for key in dict.fromkeys(keys) if key not in self._surfaces]
+        tasks = {key: partial(self.decode, key) for key in keys}
+        results, _ = load_in_parallel(tasks, self.finalize, on_progress, workers)
+        self._surfaces.update(results)
+
+    def prefetch(self, keys):
+        """Decode any of keys that are not loaded yet. Called from the preloader thread."""
+        for key in keys:
+            with self._lock:
+                if key in self._surfaces or key in self._decoded or key in self._in_flight:
+                    continue
+                self._in_flight.add(key)
+            try:
+                decoded = self.decode(key)
+            except KeyError:
+                decoded = None
+            with self._lock:
+                self._in_flight.discard(key)
+                if decoded is not None:
+                    self._decoded[key] = decoded
+
+    def collect(self):
+        """Finish images decoded in the background so they are ready to blit."""
+        if not self._decoded:
+            return
+        with self._lock:
+            ready, self._decoded = self._decoded, {}
+        for key, surface in ready.items():
+            if key not in self._surfaces:
+                self._surfaces[key] = self.finalize(key, surface)
+
+    def loaded(self):
+        return list(self._surfaces)
+
+
+class Preloader(threading.Thread):
+    """Background thread that decodes the assets the game is about to need.
+
+    `predict` is called every `interval` seconds and returns the image keys
+    that should be ready soon; anything not yet decoded is read off the main
+    thread and waits in the cache until the next collect().
+    """
+
+    def __init__(self, cache, predict, interval=0.25):
+        super().__init__(name="asset-preloader", daemon=True)
+        self.cache = cache
+        self.predict = predict
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.cache.prefetch(self.predict())
+            except Exception as e:  # never let a bad prediction kill the thread
+                print(f"Asset preloader error: {e}")
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,199 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+from assets import MEMORY, load_in_parallel, timed_decode
+
+
+class SoundSpec:
+    """How one sound is played: its file, channel group, priority and instance limit.
+
+    A `stream` sound may be played from disk through pygame.mixer.music
+    instead of being decoded, when decoding it would exceed the memory budget.
+    """
+
+    __slots__ = ("path", "group", "priority", "max_instances", "stream")
+
+    def __init__(self, path, group, priority=0, max_instances=1, stream=False):
+        self.path = path
+        self.group = group
+        self.priority = priority
+        self.max_instances = max_instances
+        self.stream = stream
+
+
+class SoundManager:
+    """Plays sounds on reserved channel groups with priorities and limits.
+
+    Every group owns a fixed set of mixer channels (reserved, so nothing
+    else plays on them). play() uses a free channel of the sound's group;
+    if the sound already has `max_instances` playing, its oldest instance
+    is restarted instead, and if the group is full the lowest-priority
+    sound (no higher than the new one) is cut off. Otherwise the request is
+    dropped, so rapid repeats never pile up.
+
+    Sounds are decoded the first time they play (or by preload()) and kept
+    in an LRU cache of at most `cache_bytes`, recorded in `ledger`. A
+    stream sound whose file would not fit the ledger's budget is never
+    decoded; it plays through the music stream. Without a working mixer,
+    or for a file that fails to load, play() is silent: audio never raises
+    into the frame loop.
+    """
+
+    def __init__(self, specs, groups, cache_bytes=32 * 1024 * 1024, ledger=MEMORY):
+        self.specs = specs
+        self.cache_bytes = cache_bytes
+        self.ledger = ledger
+        self._sounds = OrderedDict()
+        self._sizes = {}
+        self._failed = set()
+        self._streamed = set()
+        self._playing = {}  # channel index -> (name, priority, start order)
+        self._order = 0
+        self.groups = {}
+        self.enabled = pygame.mixer.get_init() is not None
+        if not self.enabled:
+            return
+        needed = sum(groups.values())
+        if pygame.mixer.get_num_channels() < needed:
+            pygame.mixer.set_num_channels(needed)
+        pygame.mixer.set_reserved(needed)
+        first = 0
+        for group, count in groups.items():
+            self.groups[group] = list(range(first, first + count))
+            first += count
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def sound_bytes(self, sound):
+        """Decoded size of a Sound, from its length and the mixer format."""
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+    def _decoder(self, name):
+        return timed_decode(name, lambda: pygame.mixer.Sound(self.specs[name].path))
+
+    def _store(self, name, sound):
+        self._sounds[name] = sound
+        self._sizes[name] = self.sound_bytes(sound)
+        self._sounds.move_to_end(name)
+        self.ledger.add("sound", name, self._sizes[name])
+        # Evicted sounds that are still playing finish: their channel holds a reference
+        while sum(self._sizes.values()) > self.cache_bytes and len(self._sounds) > 1:
+            evicted, _ = self._sounds.popitem(last=False)
+            del self._sizes[evicted]
+            self.ledger.remove("sound", evicted)
+        return sound
+
+    def streams(self, name):
+        """Whether name plays from disk. Decided once, the first time it is needed;
+        the decoded size is estimated from the file size."""
+        if name in self._streamed:
+            return True
+        spec = self.specs[name]
+        if not spec.stream or name in self._sounds:
+            return False
+        try:
+            estimate = os.path.getsize(spec.path)
+        except OSError:
+            return False
+        if self.ledger.fits(estimate):
+            return False
+        self._streamed.add(name)
+        self.ledger.add("sound", name, 0, quality="streamed")
+        return True
+
+    def get(self, name):
+        """The decoded Sound for name, or None if audio is off or it cannot be loaded."""
+        if not self.enabled or name in self._failed or name not in self.specs or self.streams(name):
+            return None
+        sound = self._sounds.get(name)
+        if sound is not None:
+            self._sounds.move_to_end(name)
+            return sound
+        try:
+            return self._store(name, self._decoder(name)())
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Failed to load sound {name}: {e}")
+            self._failed.add(name)
+            return None
+
+    def preload(self, names=None, on_progress=None):
+        """Decode sounds in parallel ahead of use (e.g. behind the loading screen)."""
+        names = list(self.specs) if names is None else names
+        if not self.enabled:
+            for done, name in enumerate(names, 1):
+                if on_progress:
+                    on_progress(name, done, len(names))
+            return
+        tasks = {name: self._decoder(name) for name in names
+                 if name not in self._sounds and not self.streams(name)}
+        results, errors = load_in_parallel(tasks, on_progress=on_progress)
+        for name, sound in results.items():
+            self._store(name, sound)
+        for name, error in errors.items():
+            print(f"Failed to load sound {name}: {error}")
+            self._failed.add(name)
+
+    def _pick_channel(self, name, spec):
+        busy, free = {}, None
+        for index in self.groups.get(spec.group, []):
+            if pygame.mixer.Channel(index).get_busy():
+                busy[index] = self._playing.get(index, (None, 0, 0))
+            else:
+                self._playing.pop(index, None)
+                if free is None:
+                    free = index
+        same = [index for index, playing in busy.items() if playing[0] == name]
+        if len(same) >= spec.max_instances:
+            return min(same, key=lambda index: busy[index][2])  # restart the oldest instance
+        if free is not None:
+            return free
+        weaker = [index for index, playing in busy.items() if playing[1] <= spec.priority]
+        if weaker:
+            return min(weaker, key=lambda index: (busy[index][1], busy[index][2]))
+        return None
+
+    def play(self, name, loops=0):
+        """Play a sound subject to its group, priority and instance limit; returns the Channel or None."""
+        spec = self.specs.get(name)
+        if spec is None or not self.enabled:
+            return None
+        if self.streams(name):
+            return self._stream(spec, loops)
+        index = self._pick_channel(name, spec)
+        if index is None:
+            return None
+        sound = self.get(name)
+        if sound is None:
+            return None
+        channel = pygame.mixer.Channel(index)
+        try:
+            channel.play(sound, loops)
+        except pygame.error:
+            return None
+        self._order += 1
+        self._playing[index] = (name, spec.priority, self._order)
+        return channel
+
+    def _stream(self, spec, loops):
+        """Play a sound from disk on the music stream, replacing whatever it was playing."""
+        try:
+            pygame.mixer.music.load(spec.path)
+            pygame.mixer.music.play(loops)
+        except pygame.error as e:
+            print(f"Failed to stream sound {spec.path}: {e}")
+        return None
+
+    def stop(self, name=None):
+        """Stop every instance of name, or all managed sounds."""
+        if not self.enabled:
+            return
+        if name is None and self._streamed or name in self._streamed:
+            pygame.mixer.music.stop()
+        for index, playing in list(self._playing.items()):
+            if name is None or playing[0] == name:
+                pygame.mixer.Channel(index).stop()
+                del self._playing[index]
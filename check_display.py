@@ -0,0 +1,82 @@
+"""Check the texture renderer and its software fallback without a screen.
+
+Usage: python check_display.py [FRAMES]
+
+Runs with SDL's dummy video driver and software renderer. Draws FRAMES
+frames through a TextureDisplay, alternating full presents over a
+backdrop with region-only presents, and reads the rendered window back to
+check what reached it. It then makes TextureDisplay fail and checks that
+create_display("texture") falls back to the software Display.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_RENDER_DRIVER", "software")
+import pygame
+
+import display
+from display import Display, TextureDisplay, create_display
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f"FAILED: {message}")
+
+
+def render_frames(frames):
+    """Draw frames through a TextureDisplay; returns seconds per frame."""
+    screen = TextureDisplay((800, 600), "check_display")
+    canvas = screen.canvas
+    backdrop = pygame.Surface((800, 600)).convert()
+    backdrop.fill((0, 0, 128))
+    box = pygame.Rect(0, 250, 100, 100)
+
+    started = time.perf_counter()
+    for frame in range(frames):
+        canvas.blit(backdrop, (0, 0))
+        box.x = frame * 7 % 700
+        canvas.fill((255, 0, 0), box)
+        if frame % 2:
+            screen.present_regions([box])
+        else:
+            screen.present(backdrop, [box])
+    elapsed = (time.perf_counter() - started) / max(frames, 1)
+
+    shown = screen.renderer.to_surface()
+    check(shown.get_size() == (800, 600), f"window read back at {shown.get_size()}")
+    check(tuple(shown.get_at(box.center))[:3] == (255, 0, 0), "the last region drawn is not in the window")
+    check(tuple(shown.get_at((400, 50)))[:3] == (0, 0, 128), "the backdrop is not in the window")
+    return elapsed
+
+
+def check_fallback():
+    """create_display("texture") must fall back to Display when TextureDisplay cannot be set up."""
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("no render driver (forced by check_display.py)")
+
+    display.TextureDisplay = unavailable
+    try:
+        screen = create_display((800, 600), "check_display", "texture")
+    finally:
+        display.TextureDisplay = TextureDisplay
+    check(type(screen) is Display, f"fallback gave {type(screen).__name__}")
+    screen.canvas.fill((0, 128, 0))
+    screen.present()
+    check(tuple(screen.window.get_at((400, 300)))[:3] == (0, 128, 0), "the fallback did not present the canvas")
+
+
+def main(argv):
+    frames = int(argv[1]) if len(argv) > 1 else 120
+    pygame.init()
+    elapsed = render_frames(frames)
+    print(f"TextureDisplay ({os.environ['SDL_RENDER_DRIVER']} renderer): {frames} frames, "
+          f"{elapsed * 1000:.3f} ms/frame")
+    check_fallback()
+    print("create_display('texture') fell back to Display")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
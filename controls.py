@@ -0,0 +1,117 @@
+"""Input bindings: keys and mouse buttons mapped to named actions per scene.
+
+Each scene (the main game, the start menu, a text-input mini-game...) has
+its own binding table. Entering a scene also tells SDL which event types
+to queue at all (pygame.event.set_allowed), so motion, key-up and text
+events a scene never reads are dropped before they reach the game, and
+Controls.coalesce() folds what is left: a burst of mouse motion becomes
+one event.
+"""
+from contextlib import contextmanager
+
+import pygame
+from pygame.locals import *
+
+
+ANY = None
+
+# scene -> {(event type, key or mouse button, or ANY): action}
+BINDINGS = {
+    "game": {
+        (KEYDOWN, K_q): "quest",
+        (KEYDOWN, K_SPACE): "collect",
+        (KEYDOWN, K_m): "mini_game",
+        (KEYDOWN, K_l): "leaderboard",
+        (KEYDOWN, K_e): "complete_quest",
+        (KEYDOWN, K_r): "record_globe_data",
+        (KEYDOWN, K_g): "globe_data",
+        (KEYDOWN, K_p): "community",
+        (KEYDOWN, K_ESCAPE): "quit",
+    },
+    "menu": {
+        (KEYDOWN, K_RETURN): "start",
+        (KEYDOWN, K_t): "tutorial",
+    },
+    # Full-screen information pages: tutorial, leaderboard, globe data, challenges
+    "page": {
+        (KEYDOWN, K_b): "back",
+    },
+    # Mini-games played with the mouse
+    "pointer": {
+        (MOUSEBUTTONDOWN, ANY): "click",
+    },
+    # Mini-games with an answer box (see widgets.TextInput); text arrives as
+    # TEXTINPUT, with TEXTEDITING for what an input method is still composing
+    "text_input": {
+        (KEYDOWN, K_RETURN): "submit",
+        (KEYDOWN, K_KP_ENTER): "submit",
+        (KEYDOWN, K_BACKSPACE): "erase",
+        (KEYDOWN, K_DELETE): "delete",
+        (KEYDOWN, K_LEFT): "left",
+        (KEYDOWN, K_RIGHT): "right",
+        (KEYDOWN, K_HOME): "home",
+        (KEYDOWN, K_END): "end",
+        (TEXTINPUT, ANY): "type",
+        (TEXTEDITING, ANY): "compose",
+        (MOUSEBUTTONDOWN, ANY): "click",
+    },
+}
+
+# Queued in every scene so the window can always be closed, resized and redrawn
+WINDOW_EVENTS = [QUIT, VIDEORESIZE, VIDEOEXPOSE, WINDOWRESIZED, WINDOWSIZECHANGED, WINDOWEXPOSED,
+                 WINDOWCLOSE]
+
+# Events that only matter as their latest state; a run of them collapses to the last one
+COALESCED = {MOUSEMOTION, VIDEORESIZE, WINDOWRESIZED, WINDOWSIZECHANGED, VIDEOEXPOSE, WINDOWEXPOSED}
+
+
+class Controls:
+    """Maps events to the actions bound in the current scene."""
+
+    def __init__(self, bindings=BINDINGS, filter_events=True):
+        self.bindings = bindings
+        self.filter_events = filter_events
+        self.current = None
+
+    def enter(self, scene):
+        """Make `scene` current and queue only the event types it binds."""
+        self.current = scene
+        if not self.filter_events or not pygame.display.get_init():
+            return
+        types = set(WINDOW_EVENTS) | {event_type for event_type, _ in self.bindings[scene]}
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(sorted(types))
+
+    @contextmanager
+    def scene(self, scene):
+        """Run a block in `scene`, returning to the previous scene afterwards."""
+        previous = self.current
+        self.enter(scene)
+        try:
+            yield self
+        finally:
+            if previous is not None:
+                self.enter(previous)
+
+    def action(self, event):
+        """The action `event` triggers in the current scene, or None."""
+        if event.type == QUIT:
+            return "quit"
+        table = self.bindings.get(self.current, {})
+        if event.type in (KEYDOWN, KEYUP):
+            code = event.key
+        elif event.type in (MOUSEBUTTONDOWN, MOUSEBUTTONUP):
+            code = event.button
+        else:
+            code = ANY
+        return table.get((event.type, code)) or table.get((event.type, ANY))
+
+    def coalesce(self, events):
+        """Drop events superseded later in the same batch (see COALESCED)."""
+        if len(events) < 2:
+            return events
+        last = {event.type: index for index, event in enumerate(events) if event.type in COALESCED}
+        if not last:
+            return events
+        return [event for index, event in enumerate(events)
+                if event.type not in COALESCED or last[event.type] == index]
@@ -0,0 +1,269 @@
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+
+class Display:
+    """A fixed-size logical canvas shown letterboxed in a resizable window.
+
+    The game draws everything on `canvas` in logical (800x600) coordinates.
+    present() fits it to the window at the correct aspect ratio, and
+    to_logical() maps window mouse positions back onto the canvas.
+
+    Scaling the whole canvas every frame is what we avoid: full-screen
+    static art is pre-scaled once per window size (layer()), passed to
+    present() as the backdrop, and only the regions drawn over it are
+    scaled each frame. Without a backdrop the canvas is stretched with a
+    nearest-neighbour scale into a preallocated frame surface.
+    """
+
+    def __init__(self, size=(800, 600), caption=""):
+        self.size = size
+        self.window = pygame.display.set_mode(size, pygame.RESIZABLE)
+        pygame.display.set_caption(caption)
+        self.canvas = pygame.Surface(size).convert()
+        self.window_size = None
+        self.viewport = pygame.Rect((0, 0), size)
+        self._frame = None
+        self._layers = OrderedDict()
+        self._sync()
+
+    @property
+    def scaled(self):
+        return self.viewport.size != self.size
+
+    @property
+    def backdrop_size(self):
+        """Size to pass full-screen art to present() at, or None when present() would not use it."""
+        self._sync()
+        return self.viewport.size if self.scaled else None
+
+    def set_caption(self, caption):
+        pygame.display.set_caption(caption)
+
+    def _fit(self, window_size):
+        """Letterbox the canvas into a window of this size."""
+        self.window_size = window_size
+        scale = min(window_size[0] / self.size[0], window_size[1] / self.size[1])
+        width, height = max(1, round(self.size[0] * scale)), max(1, round(self.size[1] * scale))
+        self.viewport = pygame.Rect((window_size[0] - width) // 2, (window_size[1] - height) // 2, width, height)
+
+    def _sync(self):
+        """Recompute the viewport when the window has been resized."""
+        window = pygame.display.get_surface()
+        if window is None:
+            return
+        self.window = window
+        window_size = window.get_size()
+        if window_size == self.window_size:
+            return
+        self._fit(window_size)
+        self._frame = pygame.Surface(self.viewport.size).convert() if self.scaled else None
+        self._layers.clear()
+        window.fill((0, 0, 0))  # letterbox bars
+
+    def to_logical(self, pos):
+        """Map a window position to canvas coordinates."""
+        self._sync()
+        x = (pos[0] - self.viewport.x) * self.size[0] / self.viewport.width
+        y = (pos[1] - self.viewport.y) * self.size[1] / self.viewport.height
+        return int(x), int(y)
+
+    def map_events(self, events):
+        """Rewrite mouse positions in events to canvas coordinates."""
+        self._sync()
+        # An unscaled canvas is still centred when the window is only wider or taller
+        if not self.scaled and self.viewport.topleft == (0, 0):
+            return events
+        mapped = []
+        for event in events:
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+                attributes = dict(event.dict, pos=self.to_logical(event.pos))
+                event = pygame.event.Event(event.type, attributes)
+            mapped.append(event)
+        return mapped
+
+    def layer(self, key, surface):
+        """`surface` (full canvas size) smooth-scaled to the viewport, cached until the window is resized."""
+        self._sync()
+        if not self.scaled:
+            return surface
+        scaled = self._layers.get(key)
+        if scaled is None:
+            if surface.get_bitsize() < 24:  # smoothscale needs true colour; budgeted art may be 16-bit
+                surface = surface.convert(32)
+            scaled = pygame.transform.smoothscale(surface, self.viewport.size).convert()
+            self._layers[key] = scaled
+            if len(self._layers) > 16:
+                self._layers.popitem(last=False)
+        return scaled
+
+    def to_window(self, rect):
+        """Map a canvas rect to the window rect it is shown in."""
+        sx = self.viewport.width / self.size[0]
+        sy = self.viewport.height / self.size[1]
+        left, top = int(rect.left * sx), int(rect.top * sy)
+        right, bottom = int(rect.right * sx + 0.999), int(rect.bottom * sy + 0.999)
+        return pygame.Rect(self.viewport.x + left, self.viewport.y + top, right - left, bottom - top)
+
+    def _show_regions(self, regions):
+        """Copy canvas regions to the window, scaled; returns the window rects written."""
+        bounds = self.canvas.get_rect()
+        targets = []
+        for region in regions:
+            region = pygame.Rect(region).clip(bounds)
+            if region.width and region.height:
+                target = self.to_window(region)
+                if self.scaled:
+                    self.window.blit(pygame.transform.scale(self.canvas.subsurface(region), target.size), target)
+                else:
+                    self.window.blit(self.canvas, target, region)
+                targets.append(target)
+        return targets
+
+    def present(self, backdrop=None, regions=None):
+        """Show the canvas in the window.
+
+        backdrop is full-screen art already at viewport size (see layer());
+        regions are the canvas rects drawn on top of it this frame. Given
+        both, only those regions are scaled.
+        """
+        self._sync()
+        if not self.scaled:
+            self.window.blit(self.canvas, self.viewport)
+        elif backdrop is not None and regions is not None:
+            self.window.blit(backdrop, self.viewport)
+            self._show_regions(regions)
+        else:
+            pygame.transform.scale(self.canvas, self.viewport.size, self._frame)
+            self.window.blit(self._frame, self.viewport)
+        pygame.display.flip()
+
+    def present_regions(self, regions):
+        """Show only these canvas regions; the rest of the window keeps what it shows.
+        After a resize the whole canvas is presented instead."""
+        window_size = self.window_size
+        self._sync()
+        if self.window_size != window_size:
+            self.present()
+            return
+        pygame.display.update(self._show_regions(regions))
+
+
+class TextureDisplay(Display):
+    """A Display presented through an SDL2 Renderer (pygame._sdl2.video).
+
+    The game still draws on the same software canvas. Full-screen art passed
+    to present() as the backdrop is uploaded as a texture once and kept
+    while the surface lives; the canvas is a streaming texture of which only
+    the regions drawn this frame are uploaded. The renderer scales both to
+    the viewport, on the GPU when its driver is accelerated, so backdrops
+    are passed at canvas size (backdrop_size) rather than pre-scaled.
+
+    SDL picks the render driver; SDL_RENDER_DRIVER=software forces its
+    software renderer, which also works with the dummy video driver.
+    pygame.display keeps a hidden 1x1 window so Surface.convert() still has
+    a pixel format to convert to.
+    """
+
+    def __init__(self, size=(800, 600), caption="", vsync=False):
+        from pygame._sdl2 import video  # experimental in pygame 2; see create_display()
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.size = size
+        self.sdl_window = video.Window(caption, size, resizable=True)
+        self.renderer = video.Renderer(self.sdl_window, vsync=vsync)
+        self.renderer.draw_color = (0, 0, 0, 255)  # letterbox bars
+        self._canvas_texture = video.Texture(self.renderer, size, streaming=True)
+        self._texture_type = video.Texture
+        self._textures = OrderedDict()  # id(surface) -> (weak reference to surface, texture)
+        self._uploaded = False  # whether the canvas texture holds the whole canvas
+        self.canvas = pygame.Surface(size).convert()
+        self.window = None
+        self.window_size = None
+        self.viewport = pygame.Rect((0, 0), size)
+        self._sync()
+
+    @property
+    def backdrop_size(self):
+        return self.size
+
+    def set_caption(self, caption):
+        self.sdl_window.title = caption
+
+    def _sync(self):
+        window_size = self.sdl_window.size
+        if window_size != self.window_size:
+            self._fit(window_size)
+
+    def layer(self, key, surface):
+        """Full-screen art is uploaded as it is; the renderer scales it."""
+        return surface
+
+    def map_events(self, events):
+        # pygame.display's hidden window stays open, so SDL never sends QUIT for this one
+        events = [pygame.event.Event(pygame.QUIT) if event.type == pygame.WINDOWCLOSE else event
+                  for event in events]
+        return super().map_events(events)
+
+    def texture(self, surface):
+        """The texture for `surface`, uploaded the first time it is shown."""
+        entry = self._textures.get(id(surface))
+        if entry is not None and entry[0]() is surface:
+            self._textures.move_to_end(id(surface))
+            return entry[1]
+        texture = self._texture_type.from_surface(self.renderer, surface)
+        self._textures[id(surface)] = (weakref.ref(surface), texture)
+        while len(self._textures) > 16:
+            self._textures.popitem(last=False)
+        return texture
+
+    def _upload(self, regions):
+        """Copy canvas regions to the canvas texture; returns them clipped to the canvas."""
+        bounds = self.canvas.get_rect()
+        clipped = []
+        for region in regions:
+            region = pygame.Rect(region).clip(bounds)
+            if region.width and region.height:
+                self._canvas_texture.update(self.canvas.subsurface(region), region)
+                clipped.append(region)
+        return clipped
+
+    def _draw_canvas(self):
+        if not self._uploaded:
+            self._canvas_texture.update(self.canvas)
+            self._uploaded = True
+        self._canvas_texture.draw(dstrect=self.viewport)
+
+    def present(self, backdrop=None, regions=None):
+        self._sync()
+        self.renderer.clear()
+        if backdrop is not None and regions is not None:
+            self.texture(backdrop).draw(dstrect=self.viewport)
+            for region in self._upload(regions):
+                self._canvas_texture.draw(srcrect=region, dstrect=self.to_window(region))
+            self._uploaded = False  # the canvas texture is stale outside the regions
+        else:
+            self._uploaded = False
+            self._draw_canvas()
+        self.renderer.present()
+
+    def present_regions(self, regions):
+        # A presented frame is gone, so the whole canvas is drawn; only the regions are uploaded
+        self._sync()
+        if self._uploaded:
+            self._upload(regions)
+        self.renderer.clear()
+        self._draw_canvas()
+        self.renderer.present()
+
+
+def create_display(size=(800, 600), caption="", renderer="surface"):
+    """The Display for a renderer setting: "texture" uses TextureDisplay when
+    pygame's SDL2 video API can be set up and the software Display otherwise."""
+    if renderer == "texture":
+        try:
+            return TextureDisplay(size, caption)
+        except Exception as e:  # pygame._sdl2 is experimental: missing, or no usable render driver
+            print(f"Texture renderer unavailable, drawing in software: {e}")
+    return Display(size, caption)
@@ -0,0 +1,128 @@
+"""Reward, experience and environment-health values for EcoQuest.
+
+game.py plays by these numbers and simulate.py tunes them, so a change
+here is a change to both.
+"""
+
+
+# The main loop is capped at this many frames per second; per-frame values
+# such as health_decay assume it, and simulate.py converts frames with it
+FPS = 60
+
+
+def environment_for_level(level):
+    """Name of the environment the player is in at the given level."""
+    if level < 3:
+        return "Urban"
+    elif level < 6:
+        return "Ocean"
+    return "Forest"
+
+
+def eligible_mini_games(level):
+    """Mini-games start_mini_game can pick from at the given level."""
+    if level < 3:
+        return ["sort_trash", "recycling_quiz", "clean_up_neighborhood"]
+    elif level >= 3 and level < 10:
+        return ["clean_up_neighborhood","clean_beach","match_habitat"]
+    return ["match_habitat", "clean_up_neighborhood", "plant_trees"]
+
+
+class Economy:
+    """Tunable game-economy values. Pass keyword overrides to try other numbers."""
+
+    max_health = 1000
+    # Environment health lost every frame of the main loop, before pollution
+    health_decay = 0.1
+    # Each region of a biome (see environment.py) loses health_decay * (1 + pollution_damage
+    # * its pollution) per frame; pollution runs 0 (clean) to 1
+    pollution_damage = 0.5
+    # Share of a region's pollution exchanged with its neighbours, and lost, every frame
+    pollution_diffusion = 0.05
+    pollution_dissipation = 0.001
+    # Starting pollution of every region, drawn uniformly from this range
+    initial_pollution = (0.0, 0.2)
+    # Share of regions that are polluting hotspots, and the pollution each adds per frame (range)
+    hotspot_share = 0.02
+    hotspot_emission = (0.001, 0.004)
+    # Share of the biome's pollution removed by completing a quest
+    quest_clean_up = 0.5
+    # Environment health restored by a won mini-game or a level up
+    heal_amount = 50
+    # level_up_exp = exp_per_level * (level + 1)
+    exp_per_level = 10
+    # Score and exp for collecting an item (SPACE), drawn uniformly from this range
+    collect_points = (1, 2)
+    # (score, exp) for winning each mini-game
+    mini_game_rewards = {
+        "sort_trash": (50, 10),
+        "recycling_quiz": (50, 10),
+        "match_habitat": (50, 10),
+        "clean_up_neighborhood": (75, 10),
+        "plant_trees": (100, 10),
+        "clean_beach": (0, 10),
+    }
+    quests = {
+        "Urban": [
+            {"task": "Collect 3 recyclable items", "reward": 25, "completed": False, "minigame": "sort_trash_mini_game"},
+            {"task": "Educate 3 friends about recycling", "reward": 50, "completed": False, "minigame": "recycling_quiz_mini_game"},
+        ],
+        "Ocean": [
+            {"task": "Help clean up the beach", "reward": 50, "completed": False},
+            {"task": "Recognize plastic waste", "reward": 100, "completed": False},
+        ],
+        "Forest": [
+            {"task": "Find the Hidden Trees!", "reward": 100, "completed": False},
+            {"task": "Identify wildlife habitats", "reward": 75, "completed": False},
+        ],
+    }
+    # Exp granted when each quest is completed
+    quest_exp = {
+        "Collect 3 recyclable items": 10,
+        "Educate 3 friends about recycling": 10,
+        "Help clean up the beach": 75,
+        "Recognize plastic waste": 75,
+        "Find the Hidden Trees!": 75,
+        "Identify wildlife habitats": 85,
+    }
+    # Mini-game each quest is played through, and how many wins it needs
+    quest_mini_games = {
+        "Collect 3 recyclable items": ("sort_trash", 3),
+        "Educate 3 friends about recycling": ("recycling_quiz", 3),
+        "Help clean up the beach": ("clean_beach", 3),
+        "Recognize plastic waste": ("clean_up_neighborhood", 1),
+        "Find the Hidden Trees!": ("plant_trees", 1),
+        "Identify wildlife habitats": ("match_habitat", 3),
+    }
+    # Quests whose completion checks for a level up, which needs exp to pass level_up_exp
+    # rather than reach it; exp from the others counts at the next collect or mini-game
+    quests_checking_level_up = (
+        "Help clean up the beach",
+        "Recognize plastic waste",
+        "Find the Hidden Trees!",
+        "Identify wildlife habitats",
+    )
+    # Completing this quest ends the game
+    final_quest = "Identify wildlife habitats"
+
+    def __init__(self, **overrides):
+        for name, value in overrides.items():
+            if name.startswith("_") or not hasattr(type(self), name) or callable(getattr(type(self), name)):
+                raise AttributeError(f"unknown economy setting {name!r}")
+            setattr(self, name, value)
+
+    def level_up_exp(self, level):
+        """Exp needed to leave the given level."""
+        return self.exp_per_level * (level + 1)
+
+    def quest_levels_up(self, task, exp, level_up_exp):
+        """Whether completing quest `task` with this much exp levels the player up."""
+        return task in self.quests_checking_level_up and exp > level_up_exp
+
+    def healed(self, health):
+        """Health after a heal: heal_amount more, never above max_health."""
+        return min(health + self.heal_amount, self.max_health)
+
+    def quests_for_level(self, level):
+        """Fresh copies of the quests offered at the given level."""
+        return [dict(quest) for quest in self.quests[environment_for_level(level)]]
@@ -0,0 +1,190 @@
+import numpy as np
+import pygame
+
+
+# Celebration colours: greens, leaf yellow and water blue
+PALETTE = [(60, 220, 90), (150, 240, 60), (250, 230, 90), (90, 200, 250), (255, 255, 255)]
+
+
+class ParticlePool:
+    """Fixed-capacity particle effects that never allocate once running.
+
+    Every particle attribute lives in a preallocated NumPy array of length
+    `capacity`; emit() fills slots round-robin (overwriting the oldest when
+    the pool is full) and update()/draw() work on whole arrays with `out=`
+    buffers. Particles are written straight into the pixel buffer behind a
+    colour-keyed layer surface (created with pygame.image.frombuffer, so no
+    surface lock or copy is involved), which the render pass blits in one
+    call. Dead or off-screen particles are pointed at a sink row just past
+    the visible pixels instead of being compacted. Only the bounding box of
+    the pixels drawn and erased this frame is blitted and reported, so a
+    small burst does not make the whole canvas count as redrawn.
+    """
+
+    def __init__(self, size=(800, 600), capacity=4096, gravity=300.0, seed=0):
+        self.width, self.height = size
+        self.capacity = capacity
+        self.gravity = gravity
+        self._rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.uint32)
+        self._next = 0
+        self._time_left = 0.0
+        self._drawn = False
+        self._box = None  # bounding box of the particle pixels on the layer
+        self._changed = None  # ... and of the pixels drawn or erased by the last draw()
+
+        # Scratch buffers reused every frame
+        self._step = np.empty(capacity, dtype=np.float32)
+        self._random = np.empty(capacity, dtype=np.float64)
+        self._xi = np.empty(capacity, dtype=np.intp)
+        self._yi = np.empty(capacity, dtype=np.intp)
+        self._index = np.full(capacity, self._sink, dtype=np.intp)
+        self._offset_index = np.empty(capacity, dtype=np.intp)
+        self._bound = np.empty(capacity, dtype=np.intp)
+        self._hidden = np.empty(capacity, dtype=bool)
+        self._test = np.empty(capacity, dtype=bool)
+
+        # Pixel buffer: the visible rows plus two sink rows for hidden particles
+        self._pixels = np.zeros((self.height + 2) * self.width, dtype=np.uint32)
+        visible = self._pixels[:self.width * self.height]
+        self.layer = pygame.image.frombuffer(visible, size, "RGBX")
+        self.colorkey = self.layer.map_rgb((255, 0, 255))
+        self.layer.set_colorkey((255, 0, 255))
+        self._pixels.fill(self.colorkey)
+        self._palette = np.array([self.layer.map_rgb(color) for color in PALETTE], dtype=np.uint32)
+        self._offsets = (0, 1, self.width, self.width + 1)  # each particle is 2x2 pixels
+
+    @property
+    def _sink(self):
+        return self.width * self.height
+
+    @property
+    def active(self):
+        """True while any particle may still be alive."""
+        return self._time_left > 0 or self._drawn
+
+    def emit(self, x, y, count=60, speed=220.0, lifetime=1.2, color=None):
+        """Burst `count` particles out of (x, y)."""
+        count = min(count, self.capacity)
+        start = self._next
+        end = start + count
+        if end <= self.capacity:
+            self._emit_slice(start, end, x, y, speed, lifetime, color)
+        else:
+            self._emit_slice(start, self.capacity, x, y, speed, lifetime, color)
+            self._emit_slice(0, end - self.capacity, x, y, speed, lifetime, color)
+        self._next = end % self.capacity
+        self._time_left = max(self._time_left, lifetime)
+
+    def _emit_slice(self, start, end, x, y, speed, lifetime, color):
+        random = self._random[start:end]
+        self.x[start:end] = x
+        self.y[start:end] = y
+        # Random direction and speed, biased upwards like a fountain
+        self._rng.random(out=random)
+        random *= 2 * np.pi
+        self.vx[start:end] = np.cos(random)
+        self.vy[start:end] = np.sin(random)
+        self.vy[start:end] -= 1.0
+        self._rng.random(out=random)
+        random *= 0.7
+        random += 0.3
+        random *= speed
+        self.vx[start:end] *= random
+        self.vy[start:end] *= random
+        self._rng.random(out=random)
+        random *= 0.5 * lifetime
+        random += 0.5 * lifetime
+        self.life[start:end] = random
+        if color is None:
+            self._rng.random(out=random)
+            random *= len(self._palette)
+            self.color[start:end] = self._palette[random.astype(np.intp)]
+        else:
+            self.color[start:end] = self.layer.map_rgb(color)
+
+    def update(self, dt):
+        """Move every particle by dt seconds."""
+        if self._time_left <= 0:
+            return
+        self._time_left -= dt
+        step = self._step
+        np.multiply(self.vx, dt, out=step)
+        self.x += step
+        self.vy += self.gravity * dt
+        np.multiply(self.vy, dt, out=step)
+        self.y += step
+        self.life -= dt
+
+    def draw(self):
+        """Redraw the particle layer from the arrays."""
+        if not self.active:
+            return
+        pixels, index, offset_index = self._pixels, self._index, self._offset_index
+        # Erase last frame's pixels
+        for offset in self._offsets:
+            np.add(index, offset, out=offset_index)
+            pixels.put(offset_index, self.colorkey)
+        if self._time_left <= 0:
+            index.fill(self._sink)
+            self._drawn = False
+            self._changed, self._box = self._box, None
+            return
+
+        xi, yi, hidden, test = self._xi, self._yi, self._hidden, self._test
+        np.copyto(xi, self.x, casting="unsafe")
+        np.copyto(yi, self.y, casting="unsafe")
+        np.less_equal(self.life, 0, out=hidden)
+        np.less(xi, 0, out=test)
+        hidden |= test
+        np.less(yi, 0, out=test)
+        hidden |= test
+        np.greater(xi, self.width - 2, out=test)
+        hidden |= test
+        np.greater(yi, self.height - 2, out=test)
+        hidden |= test
+        np.multiply(yi, self.width, out=index)
+        index += xi
+        np.copyto(index, self._sink, where=hidden)
+        for offset in self._offsets:
+            np.add(index, offset, out=offset_index)
+            pixels.put(offset_index, self.color)
+        self._drawn = True
+
+        box = self._bounding_box(xi, yi, hidden)
+        previous, self._box = self._box, box
+        if box and previous:
+            box = box.union(previous)
+        self._changed = box or previous
+
+    def _bounding_box(self, xi, yi, hidden):
+        """Rect around the visible particles (2x2 pixels each), or None."""
+        bound = self._bound
+        limits = []
+        for values, outside in ((xi, self.width), (yi, self.height)):
+            np.copyto(bound, values)
+            np.copyto(bound, outside, where=hidden)
+            low = int(bound.min())
+            np.copyto(bound, -1, where=hidden)
+            limits.append((low, int(bound.max())))
+        (left, right), (top, bottom) = limits
+        if left > right:
+            return None
+        return pygame.Rect(left, top, right - left + 2, bottom - top + 2)
+
+    def blit(self, target):
+        """Draw what changed in the particle layer onto target; returns the rect touched, or None."""
+        box, self._changed = self._changed, None
+        if box is None:
+            return None
+        return target.blit(self.layer, box, box)
+
+    def clear(self):
+        self.life.fill(0)
+        self._time_left = 0.0
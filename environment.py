@@ -0,0 +1,128 @@
+import numpy as np
+
+
+BIOMES = ("Urban", "Ocean", "Forest")
+# float32 keeps saves small and exact: the arrays are stored as they are
+DTYPE = np.float32
+
+
+class EnvironmentModel:
+    """Environment health of many regions per biome, stepped with array math.
+
+    Each biome is a grid of regions holding a health value and a pollution
+    level (0 = clean). Every tick the active biome's regions lose health in
+    proportion to their pollution, pollution spreads to neighbouring regions
+    and slowly dissipates, and polluting hotspots emit more. All updates
+    work on whole arrays with preallocated buffers, so a step costs the same
+    handful of NumPy calls whether a biome has a hundred regions or ten
+    thousand. The health shown on the HUD is the mean over the active biome.
+
+    The rates come from economy.Economy (game.py passes them in), so
+    simulate.py can model the same numbers.
+    """
+
+    def __init__(self, rows=32, cols=32, max_health=1000, decay=0.1, pollution_damage=0.5,
+                 diffusion=0.05, dissipation=0.001, initial_pollution=(0.0, 0.2), hotspot_share=0.02,
+                 hotspot_emission=(0.001, 0.004), seed=0):
+        self.rows, self.cols = rows, cols
+        self.max_health = max_health
+        self.decay = decay
+        self.pollution_damage = pollution_damage
+        self.diffusion = diffusion
+        self.dissipation = dissipation
+        rng = np.random.default_rng(seed)
+        shape = (len(BIOMES), rows, cols)
+        self.health = np.full(shape, max_health, dtype=DTYPE)
+        self.pollution = rng.uniform(*initial_pollution, shape).astype(DTYPE)
+        # A few hotspots per biome (roads, outflows, logging) keep emitting pollution
+        self.emission = np.where(rng.random(shape) < hotspot_share, rng.uniform(*hotspot_emission, shape),
+                                 0.0).astype(DTYPE)
+        # Neighbour count per region, for a diffusion that conserves pollution at the edges
+        neighbours = np.full((rows, cols), 4.0, dtype=DTYPE)
+        neighbours[0, :] -= 1
+        neighbours[-1, :] -= 1
+        neighbours[:, 0] -= 1
+        neighbours[:, -1] -= 1
+        self._neighbours = neighbours
+        self._flow = np.empty((rows, cols), dtype=DTYPE)
+        self._scratch = np.empty((rows, cols), dtype=DTYPE)
+
+    @property
+    def regions(self):
+        return self.rows * self.cols
+
+    def _index(self, biome):
+        return BIOMES.index(biome)
+
+    def step(self, biome):
+        """Advance the active biome by one frame."""
+        b = self._index(biome)
+        health, pollution = self.health[b], self.pollution[b]
+        flow, scratch = self._flow, self._scratch
+
+        # Diffusion: each region exchanges pollution with its 4 neighbours
+        np.multiply(pollution, self._neighbours, out=flow)
+        np.negative(flow, out=flow)
+        flow[1:, :] += pollution[:-1, :]
+        flow[:-1, :] += pollution[1:, :]
+        flow[:, 1:] += pollution[:, :-1]
+        flow[:, :-1] += pollution[:, 1:]
+        flow *= self.diffusion
+        pollution += flow
+        pollution += self.emission[b]
+        pollution *= 1.0 - self.dissipation
+        np.clip(pollution, 0.0, 1.0, out=pollution)
+
+        # Decay: the base rate, made worse by local pollution
+        np.multiply(pollution, self.pollution_damage * self.decay, out=scratch)
+        scratch += self.decay
+        health -= scratch
+        np.maximum(health, 0.0, out=health)
+
+    def health_of(self, biome):
+        """Aggregate (mean) health of a biome, as shown on the HUD."""
+        return float(self.health[self._index(biome)].mean())
+
+    def pollution_of(self, biome):
+        return float(self.pollution[self._index(biome)].mean())
+
+    def set_health(self, biome, value):
+        """Shift every region so the biome's aggregate health becomes value."""
+        health = self.health[self._index(biome)]
+        health += value - health.mean()
+        np.clip(health, 0.0, self.max_health, out=health)
+
+    def heal(self, biome, amount):
+        """Raise every region of the biome by amount, up to the maximum."""
+        health = self.health[self._index(biome)]
+        health += amount
+        np.minimum(health, self.max_health, out=health)
+
+    def clean_up(self, biome, fraction=0.5):
+        """A completed quest removes a share of the pollution across the biome."""
+        self.pollution[self._index(biome)] *= 1.0 - fraction
+
+    def report_globe_data(self, biome, value):
+        """Recorded globe data pinpoints the worst region so it can be cleaned up.
+
+        value is the 1-10 reading from record_globe_data; the dirtiest region
+        and its neighbours lose pollution in proportion to it.
+        """
+        pollution = self.pollution[self._index(biome)]
+        row, col = np.unravel_index(np.argmax(pollution), pollution.shape)
+        area = pollution[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2]
+        area *= max(0.0, 1.0 - value / 10.0)
+
+    def state(self):
+        """Arrays to persist, in a fixed order."""
+        return self.health, self.pollution, self.emission
+
+    def load_state(self, health, pollution, emission=None):
+        """Adopt saved arrays. Without emission (older saves) the hotspots drawn from this session's seed stay."""
+        arrays = (health, pollution) if emission is None else (health, pollution, emission)
+        if any(array.shape != self.health.shape for array in arrays):
+            raise ValueError("saved environment does not match this region layout")
+        self.health[...] = health
+        self.pollution[...] = pollution
+        if emission is not None:
+            self.emission[...] = emission
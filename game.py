@@ -1,43 +1,132 @@
 import pygame
-from pygame.locals import *
 import random
 import time
 import json
-
-# Initialize Pygame and the mixer for sound effects
+import os
+import socket
+from functools import wraps
+
+import savestate
+from economy import FPS, Economy, eligible_mini_games, environment_for_level
+from environment import EnvironmentModel
+from visuals import BackgroundTinter
+from replay import LiveEvents, Recorder
+from display import create_display
+from text_layout import TextLayout, get_font
+from assets import MEMORY, ImageCache, Preloader
+from effects import ParticlePool
+from audio import SoundManager, SoundSpec
+from metrics import (DURATION_BUCKETS, FRAME_BUCKETS, REGISTRY, MetricsExporter)
+from sync import SyncClient
+from controls import WINDOW_EVENTS, Controls
+from widgets import TextInput
+
+# Initialize Pygame and the mixer for sound effects; without an audio device the game runs silent
 pygame.init()
-pygame.mixer.init()
+try:
+    pygame.mixer.init()
+except pygame.error as e:
+    print(f"Audio disabled: {e}")
+
+# Where the session is saved and how often it is autosaved (seconds, 0 disables)
+SAVE_PATH = os.environ.get("ECOQUEST_SAVE", "savegame.bin")
+AUTOSAVE_INTERVAL = float(os.environ.get("ECOQUEST_AUTOSAVE_INTERVAL", "30"))
+
+# Record every input event of the session to this file for replay.py
+RECORD_PATH = os.environ.get("ECOQUEST_RECORD")
+
+# Metrics are written to METRICS_PATH.prom and .json every METRICS_INTERVAL seconds (0 disables),
+# with the asset memory report in METRICS_PATH.memory.json
+METRICS_PATH = os.environ.get("ECOQUEST_METRICS", "metrics")
+METRICS_INTERVAL = float(os.environ.get("ECOQUEST_METRICS_INTERVAL", "60"))
+
+# Optional shared leaderboard and challenges: "host:port" of a sync_server.py (unset = offline)
+SYNC_SERVER = os.environ.get("ECOQUEST_SYNC")
+SYNC_INTERVAL = float(os.environ.get("ECOQUEST_SYNC_INTERVAL", "15"))
+KIOSK_ID = os.environ.get("ECOQUEST_KIOSK_ID") or socket.gethostname()
+
+# How often an idle static screen (menu, leaderboard...) wakes up to check for changes, in ms
+PAGE_REFRESH_MS = int(os.environ.get("ECOQUEST_PAGE_REFRESH_MS", "1000"))
+
+# Most memory loaded images and sounds may take, in bytes (0: no budget). Over it,
+# backgrounds are kept in 16-bit colour or at half resolution and music is streamed
+ASSET_BUDGET = int(os.environ.get("ECOQUEST_ASSET_BUDGET_BYTES", "0"))
+
+# Most particles the feedback effects keep alive at once
+EFFECT_CAPACITY = int(os.environ.get("ECOQUEST_EFFECT_CAPACITY", "4096"))
+
+# How frames reach the window: "surface" (software blits) or "texture" (SDL2 renderer,
+# scaled on the GPU where available; falls back to "surface" if it cannot be set up)
+RENDERER = os.environ.get("ECOQUEST_RENDERER", "surface")
 
 # Set up the display
-screen = pygame.display.set_mode((800, 600), pygame.RESIZABLE)
-pygame.display.set_caption("EcoQuest: Global Guardians")
+# Everything is drawn on an 800x600 logical canvas that is scaled to fit the window
+display = create_display((800, 600), "EcoQuest: Global Guardians", RENDERER)
+screen = display.canvas
 
-# Load images with error handling
+# Load images lazily; each one is decoded the first time it is used
 def load_images():
-    try:
-        return {key: pygame.image.load(f"assets/{key}.png") for key in [
-            "urban_background", "ocean_background", "forest_background", 
-            "tree", "plastic_bottle", "scoreboard", "correct", 
-            "incorrect", "recycle_bin", "animal_habitat", 
-            "game_over","menu_background", "community_challenge","waste"]}
-    except pygame.error as e:
-        print(f"Failed to load images: {e}")
-        return {}
-
-# Load sound effects with error handling
-def load_sounds():
-    try:
-        return {
-            "correct": pygame.mixer.Sound("assets/correct_sound.wav"),
-            "incorrect": pygame.mixer.Sound("assets/incorrect_sound.wav"),
-            "background_music": pygame.mixer.Sound("assets/background_music.wav"),
-            "item_collect": pygame.mixer.Sound("assets/item_collect.wav"),
-            "level_up": pygame.mixer.Sound("assets/level_up.wav"),
-            "challenge_complete": pygame.mixer.Sound("assets/challenge_complete.wav")
-        }
-    except pygame.error as e:
-        print(f"Failed to load sounds: {e}")
-        return {}
+    return ImageCache("assets")
+
+# Sound effects: file, channel group, priority (higher cuts off lower) and most instances at once
+SOUNDS = {
+    "background_music": SoundSpec("assets/background_music.wav", "music", 10, stream=True),
+    "level_up": SoundSpec("assets/level_up.wav", "feedback", 8),
+    "challenge_complete": SoundSpec("assets/challenge_complete.wav", "feedback", 7),
+    "correct": SoundSpec("assets/correct_sound.wav", "feedback", 5),
+    "incorrect": SoundSpec("assets/incorrect_sound.wav", "feedback", 5),
+    "item_collect": SoundSpec("assets/item_collect.wav", "effects", 1, max_instances=2),
+}
+# Mixer channels reserved for each group
+SOUND_CHANNELS = {"music": 1, "feedback": 1, "effects": 2}
+# Most decoded audio kept in memory, in bytes
+SOUND_CACHE_BYTES = int(os.environ.get("ECOQUEST_SOUND_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Reward, exp and health values (see economy.py)
+ECONOMY = Economy()
+
+# What the kiosks report (see metrics.py)
+FRAME_SECONDS = REGISTRY.histogram("ecoquest_frame_seconds", "Main loop frame time.", buckets=FRAME_BUCKETS)
+MINI_GAME_SECONDS = REGISTRY.histogram("ecoquest_mini_game_seconds", "Time spent in a mini-game.",
+                                       ("game",), DURATION_BUCKETS)
+MINI_GAMES = REGISTRY.counter("ecoquest_mini_games_total", "Mini-games played, by outcome.", ("game", "result"))
+QUEST_SECONDS = REGISTRY.histogram("ecoquest_quest_seconds", "Time from starting a quest to completing it.",
+                                   ("quest",), DURATION_BUCKETS)
+QUIZ_ANSWERS = REGISTRY.counter("ecoquest_quiz_answers_total", "Answers given to each quiz item, by result.",
+                                ("game", "item", "result"))
+LEADERBOARD_WRITE_SECONDS = REGISTRY.histogram("ecoquest_leaderboard_write_seconds",
+                                               "Time to write leaderboard.json.")
+KEY_ACTIONS = REGISTRY.counter("ecoquest_key_actions_total", "Game keys pressed, by action.", ("action",))
+LEVEL_UPS = REGISTRY.counter("ecoquest_level_ups_total", "Levels gained.")
+LEVEL = REGISTRY.gauge("ecoquest_level", "Current player level.")
+ENVIRONMENT_HEALTH = REGISTRY.gauge("ecoquest_environment_health", "Mean health of the current environment.")
+
+
+def in_scene(scene):
+    """Decorator: run the method with the input bindings of `scene` (see controls.py)."""
+    def decorate(method):
+        @wraps(method)
+        def run(self, *args, **kwargs):
+            with self.controls.scene(scene):
+                return method(self, *args, **kwargs)
+        return run
+    return decorate
+
+
+def mini_game(name, scene):
+    """Decorator for mini-game methods: play in an input scene, time every run
+    and count how it ended."""
+    def decorate(method):
+        @wraps(method)
+        def play(self, *args, **kwargs):
+            started = time.perf_counter()
+            with self.controls.scene(scene):
+                result = method(self, *args, **kwargs)
+            MINI_GAME_SECONDS.labels(name).observe(time.perf_counter() - started)
+            MINI_GAMES.labels(name, "success" if result else "failure").inc()
+            return result
+        return play
+    return decorate
 
 # Constants for colors
 WHITE = (255, 255, 255)
@@ -46,24 +135,129 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 FONT_COLOR = (255, 255, 197)
 DARK_BLUE = (0, 0, 128)
+# Translucent panel behind pop-up messages
+PANEL = (0, 0, 0, 160)
+# Where read_answer() puts the answer box; prompts are placed just above it
+ANSWER_BOX = (250, 300, 140, 32)
+
+# Wrapped text blocks, laid out once and reused every frame
+TEXT = TextLayout()
+
+
+def above_answer_box(block, gap=8):
+    """The y that ends a block `gap` pixels above the answer box, however many lines it wrapped to."""
+    return ANSWER_BOX[1] - gap - block.get_height()
+
+
+def on_canvas(block, y):
+    """y, moved up as far as needed for the block to end on the canvas."""
+    return min(y, screen.get_height() - block.get_height())
+
+
+# Images each mini-game blits, so they can be decoded before the game starts
+MINI_GAME_ASSETS = {
+    "sort_trash": ["plastic_bottle", "correct", "incorrect"],
+    "recycling_quiz": ["plastic_bottle", "recycle_bin", "correct", "incorrect"],
+    "clean_up_neighborhood": ["waste", "correct"],
+    "clean_beach": ["ocean_background", "recycle_bin", "plastic_bottle", "correct"],
+    "match_habitat": ["animal_habitat", "correct", "incorrect"],
+    "plant_trees": ["forest_background", "tree", "correct"],
+}
+
+# Start preloading the next level's assets once this share of level_up_exp is reached
+PRELOAD_EXP_FRACTION = 0.5
+
+
+def level_assets(level):
+    """Images the given level can need: its environment and its mini-games."""
+    keys = [environment_for_level(level).lower() + "_background"]
+    for mini_game in eligible_mini_games(level):
+        keys.extend(MINI_GAME_ASSETS[mini_game])
+    # clean_neighborhood_mini_game uses the urban or ocean background
+    keys.append("urban_background" if level < 3 else "ocean_background")
+    return keys
+
+
+def asset_environments(max_level=10):
+    """Environments that use each image, for the per-environment memory totals."""
+    environments = {}
+    for level in range(max_level + 1):
+        for key in level_assets(level):
+            environments.setdefault(key, set()).add(environment_for_level(level))
+    return {key: sorted(names) for key, names in environments.items()}
+
+
+class LoadingScreen:
+    """Progress bar drawn while the startup assets are decoded (counted only when headless)."""
+    def __init__(self, total, headless=False):
+        self.total = total
+        self.done = 0
+        self.headless = headless
+        self.font = get_font(36)
+
+    def advance(self, name, *_):
+        """Count one finished asset and redraw the bar."""
+        self.done += 1
+        if self.headless:
+            return
+        pygame.event.pump()
+        screen.fill(DARK_BLUE)
+        title = self.font.render("Loading EcoQuest...", True, FONT_COLOR)
+        screen.blit(title, (290, 230))
+        pygame.draw.rect(screen, (211,211,211), (150, 280, 500, 30), 2)
+        pygame.draw.rect(screen, GREEN, (152, 282, int(496 * self.done / max(self.total, 1)), 26))
+        status = self.font.render(f"{self.done}/{self.total}  {name}", True, FONT_COLOR)
+        screen.blit(status, (150, 330))
+        display.present()
 
 class EcoQuestGame:
-    def __init__(self):
+    def __init__(self, seed=None, events=None, headless=False, save_path=SAVE_PATH):
+        """seed fixes the session's random numbers; events replaces live input
+        (see replay.py); headless skips rendering, flips and delays; save_path
+        None disables resume and autosave."""
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.headless = headless
+        self.save_path = save_path
         self.running = True
+        self.game_finished = False
         self.level = 0  
         self.player_score = 0
-        self.environment_health = 1000
         self.current_environment = ["Urban", "Ocean", "Forest"]
-        self.images = load_images()
-        self.sounds = load_sounds()
         self.current_environment_name = self.current_environment[self.level]
+        # Regional health and pollution of every biome; environment_health is its aggregate
+        self.environment = EnvironmentModel(max_health=ECONOMY.max_health, decay=ECONOMY.health_decay,
+                                            pollution_damage=ECONOMY.pollution_damage,
+                                            diffusion=ECONOMY.pollution_diffusion,
+                                            dissipation=ECONOMY.pollution_dissipation,
+                                            initial_pollution=ECONOMY.initial_pollution,
+                                            hotspot_share=ECONOMY.hotspot_share,
+                                            hotspot_emission=ECONOMY.hotspot_emission, seed=self.seed)
         self.quest_active = False
         self.quest_message = ""
         self.educational_popups = []
         self.gloabe_data_entries = []
         self.leaderboard = self.load_leaderboard()
         self.exp = 0
-        self.level_up_exp = 10 * (self.level + 1)
+        self.level_up_exp = ECONOMY.level_up_exp(self.level)
+
+        # Decode the menu, the first environment and all sounds across a thread pool,
+        # accounting for the memory they take
+        MEMORY.budget = ASSET_BUDGET
+        MEMORY.environments = asset_environments()
+        self.images = load_images()
+        startup_images = ["menu_background"] + self.predicted_assets()
+        loading = LoadingScreen(len(startup_images) + len(SOUNDS), headless)
+        self.images.load_all(startup_images, loading.advance)
+        self.sounds = SoundManager(SOUNDS, SOUND_CHANNELS, SOUND_CACHE_BYTES)
+        self.sounds.preload(on_progress=loading.advance)
+        # Clean and polluted variants of the environment backgrounds
+        self.visuals = BackgroundTinter(self.images)
+        # Pooled particle bursts for collecting, cleaning and finishing quests
+        self.effects = ParticlePool(screen.get_size(), EFFECT_CAPACITY)
+        self.last_frame = time.perf_counter()
+        # Caps the main loop at FPS (see economy.py)
+        self.clock = pygame.time.Clock()
         
         # Quest management
         self.completed_quests = []
@@ -72,13 +266,156 @@ class EcoQuestGame:
         # Mini-game selection
         self.mini_game_active = False
         
+        # Pick up where the last session left off
+        self.resumed = self.resume_session()
+        self.autosaver = savestate.Autosaver(save_path, AUTOSAVE_INTERVAL if save_path else 0)
+        self.autosaver.start()
+        self.metrics_exporter = None
+        if METRICS_PATH and METRICS_INTERVAL > 0 and not headless:
+            self.metrics_exporter = MetricsExporter(REGISTRY, METRICS_PATH, METRICS_INTERVAL,
+                                                    reports={"memory": MEMORY.report})
+            self.metrics_exporter.start()
+        self.quest_started = {}
+
+        # Scores and shared lists are exchanged with the sync server in the background
+        self.sync = None
+        if SYNC_SERVER and not headless:
+            self.sync = SyncClient(SYNC_SERVER, KIOSK_ID, SYNC_INTERVAL)
+            self.sync.start()
+
+        # Keys and mouse buttons map to actions through per-scene bindings
+        self.controls = Controls()
+        # Composed static screens, see static_screen()
+        self.pages = {}
+        self.actions = {
+            "quest": self.take_quest,
+            "collect": self.collect_item,
+            "mini_game": self.start_mini_game,
+            "leaderboard": self.show_leaderboard,
+            "complete_quest": self.complete_current_quest,
+            "record_globe_data": self.record_globe_data,
+            "globe_data": self.display_globe_data,
+            "community": self.display_community_challenges,
+        }
+
+        # Input comes from the player (optionally recorded) or from a replay
+        if events is None:
+            recorder = None
+            if RECORD_PATH:
+                recorder = Recorder(RECORD_PATH, self.seed, savestate.snapshot(self))
+            events = LiveEvents(recorder, display.map_events)
+        self.events = events
+
+        # Decode upcoming environments and mini-game art off the main thread
+        self.preloader = Preloader(self.images, self.predicted_assets)
+        self.preloader.start()
+
         # Start background music based on environment
         self.play_background_music()
 
+    def predicted_assets(self):
+        """Images needed now or soon: the current environment, the mini-games
+        start_mini_game can pick, and the next level's once it is close."""
+        levels = [self.level]
+        if self.exp >= self.level_up_exp * PRELOAD_EXP_FRACTION:
+            levels.append(self.level + 1)
+        keys = [self.current_environment_name.lower() + "_background"]
+        for level in levels:
+            keys.extend(level_assets(level))
+        return list(dict.fromkeys(keys))
+
+    def resume_session(self):
+        """Restore the saved session, if there is one. Returns True on success."""
+        if not self.save_path:
+            return False
+        data = savestate.read_file(self.save_path)
+        if data is None:
+            return False
+        try:
+            savestate.restore(self, data)
+        except savestate.SaveError as e:
+            print(f"Ignoring save file: {e}")
+            return False
+        return True
+
+    def end_session(self):
+        """Save the session on exit, or discard it once the game is over."""
+        recorder = getattr(self.events, "recorder", None)
+        if recorder:
+            recorder.close(self.events.frame, savestate.snapshot(self))
+        if self.save_path:
+            if self.environment_health <= 0 or self.game_finished:
+                savestate.delete_file(self.save_path)
+            else:
+                self.autosaver.flush(self)
+        self.autosaver.stop()
+
+    @property
+    def environment_health(self):
+        """Health of the current environment: the mean over all its regions."""
+        return self.environment.health_of(self.current_environment_name)
+
+    @environment_health.setter
+    def environment_health(self, value):
+        self.environment.set_health(self.current_environment_name, value)
+
+    def poll_events(self, timeout=None):
+        """Return this frame's input events, from the player or from a replay.
+        With a timeout (ms), block until there is input or the time is up."""
+        events = self.events.get() if timeout is None else self.events.wait(timeout)
+        return self.controls.coalesce(events)
+
+    def flip(self, backdrop=None, regions=None):
+        """Show the finished frame, scaled to the window (see Display.present)."""
+        if not self.headless:
+            display.present(backdrop, regions)
+
+    def flip_regions(self, regions):
+        """Show only these canvas rects of the finished frame (see Display.present_regions)."""
+        if not self.headless:
+            display.present_regions(regions)
+
+    def delay(self, milliseconds):
+        """Pause for feedback animations; skipped when running headless."""
+        if not self.headless:
+            pygame.time.delay(milliseconds)
+
+    def burst(self, x, y, count=60, **options):
+        """Start a particle burst at (x, y); effects are skipped when running headless."""
+        if not self.headless:
+            self.effects.emit(x, y, count, **options)
+
+    def play_effects(self, milliseconds):
+        """Pause like delay(), animating live particle effects over the current frame."""
+        if self.headless:
+            return
+        if not self.effects.active:
+            self.delay(milliseconds)
+            return
+        frame = screen.copy()
+        clock = pygame.time.Clock()
+        end = pygame.time.get_ticks() + milliseconds
+        while pygame.time.get_ticks() < end:
+            dt = clock.tick(FPS) / 1000
+            pygame.event.pump()
+            screen.blit(frame, (0, 0))
+            self.effects.update(dt)
+            self.effects.draw()
+            self.effects.blit(screen)
+            self.flip()
+        screen.blit(frame, (0, 0))
+        self.last_frame = time.perf_counter()
+
+    def quest_completed(self, quest):
+        """Record how long the quest took and celebrate it."""
+        started = self.quest_started.pop(quest["task"], None)
+        if started is not None:
+            QUEST_SECONDS.labels(quest["task"]).observe(time.monotonic() - started)
+        self.burst(400, 480, 240, speed=360.0, lifetime=1.6)
+
     def play_background_music(self):
         """Play background music based on current environment."""
-        if self.sounds["background_music"]:
-            self.sounds["background_music"].play(-1)
+        self.sounds.play("background_music", loops=-1)
 
     def load_leaderboard(self):
         """Load leaderboard from a JSON file."""
@@ -89,21 +426,46 @@ class EcoQuestGame:
             return {}
 
     def save_leaderboard(self):
-        """Save leaderboard to a JSON file."""
+        """Save leaderboard to a JSON file. A headless run (e.g. a replay) keeps it in memory only."""
+        if self.headless:
+            return
+        started = time.perf_counter()
         with open('leaderboard.json', 'w') as f:
             json.dump(self.leaderboard, f)
+        LEADERBOARD_WRITE_SECONDS.observe(time.perf_counter() - started)
 
     def run(self):
         """Main game loop."""
-        self.show_start_menu()
-        while self.running:
-            self.update()
-            self.handle_events()
-            self.render()
+        try:
+            self.show_start_menu()
+            self.controls.enter("game")
+            while self.running:
+                started, frame = time.perf_counter(), self.events.frame
+                self.update()
+                self.handle_events()
+                self.render()
+                # Frames that ran a modal screen polled more than once; they are not frame time
+                if self.events.frame == frame + 1:
+                    FRAME_SECONDS.observe(time.perf_counter() - started)
+                # Health decays per frame, so frames must come at the rate the economy assumes
+                if not self.headless:
+                    self.clock.tick(FPS)
+        finally:
+            self.preloader.stop()
+            self.visuals.stop()
+            self.end_session()
+            if self.metrics_exporter:
+                self.metrics_exporter.stop()
+            if self.sync:
+                self.sync.stop()
     def update(self):
         """Update game state."""
+        # Hand over anything the preloader finished decoding
+        self.images.collect()
+        self.autosaver.tick(self)
+        ENVIRONMENT_HEALTH.set(self.environment_health)
         if not self.mini_game_active:
-            self.environment_health -= 0.1
+            self.environment.step(self.current_environment_name)
             if self.environment_health <= 0:
                 self.environment_health = 0
                 self.game_over()
@@ -111,103 +473,151 @@ class EcoQuestGame:
 
             # Change scenario if all quests are completed
             if not self.current_quests and (self.level % 3 == 0):
-                self.environment_health = 1000
+                self.environment_health = ECONOMY.max_health
          
+    @in_scene("menu")
     def show_start_menu(self):
         """Display the start menu."""
-        while True:
-            screen.blit(self.images["menu_background"], (0, 0))
-            font = pygame.font.Font(None, 74)
-            title_text = font.render("EcoQuest: Global Guardians", True, DARK_BLUE)            
-            start_text = font.render("Press Enter to Start", True, DARK_BLUE)
-            pygame.draw.rect(screen, (211,211,211), (50, 100, 712, 43))
-            screen.blit(title_text, (50, 100))
-            pygame.draw.rect(screen, (211,211,211), (150, 238, 480, 43))
-            screen.blit(start_text, (150, 238))
-
-            
-            # Level selection
-            font=pygame.font.Font(None ,47)
-            pygame.draw.rect(screen, (211,211,211), (230, 380, 300, 30))
-            levels_text = font.render("Press T for Tutorial", True, DARK_BLUE)
-            screen.blit(levels_text, (230, 380))
-            
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == KEYDOWN:
-                    if event.key == K_RETURN:
-                        return
-                    elif event.key == K_t:
-                        self.level = 0
-                        self.show_tutorial()
+        for action in self.static_screen("menu", self.compose_start_menu, lambda: self.resumed):
+            if action == "start":
+                return
+            elif action == "tutorial":
+                self.level = 0
+                self.show_tutorial()
+
+    def compose_start_menu(self):
+        screen.blit(self.images.sized("menu_background", screen.get_size()), (0, 0))
+        font = get_font(74)
+        title_text = font.render("EcoQuest: Global Guardians", True, DARK_BLUE)            
+        start_text = font.render("Press Enter to Resume" if self.resumed else "Press Enter to Start", True, DARK_BLUE)
+        regions = [pygame.draw.rect(screen, (211,211,211), (50, 100, 712, 43))]
+        screen.blit(title_text, (50, 100))
+        regions.append(pygame.draw.rect(screen, (211,211,211), (150, 238, start_text.get_width(), 43)))
+        screen.blit(start_text, (150, 238))
 
+        
+        # Level selection
+        font=get_font(47)
+        regions.append(pygame.draw.rect(screen, (211,211,211), (230, 380, 300, 30)))
+        levels_text = font.render("Press T for Tutorial", True, DARK_BLUE)
+        regions.append(screen.blit(levels_text, (230, 380)))
+        # The menu art is scaled to the window once, not every frame
+        return "menu_background", regions
+
+    @in_scene("page")
     def show_tutorial(self):
         """Show tutorial."""
-        while True:
-            screen.blit(self.images["menu_background"], (0, 0))
-            font = pygame.font.Font(None, 32)
-            text = font.render("How to play:", True, FONT_COLOR)
-            text_rect = text.get_rect(center=(400, 100))
+        for action in self.static_screen("tutorial", self.compose_tutorial):
+            if action == "back":
+                return
+
+    def compose_tutorial(self):
+        screen.blit(self.images.sized("menu_background", screen.get_size()), (0, 0))
+        font = get_font(32)
+        text = font.render("How to play:", True, FONT_COLOR)
+        text_rect = text.get_rect(center=(400, 100))
+        screen.blit(text, text_rect)
+        
+        # Show instruction
+        instruction = """
+        Q: Start Quest
+        SPACE: Collect Item
+        M: Play Mini Game
+        L: Show Leaderboard
+        E: Complete Quest
+        R: Record globe data
+        G: Display globe data
+        P: Display community challenges
+        """
+        lines = instruction.strip().splitlines()
+        y = 150
+        rect = pygame.Rect(234, y - 15, 400, len(lines) * 30)
+        pygame.draw.rect(screen, (211,211,211), rect)
+        for i, line in enumerate(lines):
+            text = font.render(line.strip(), True, FONT_COLOR)
+            text_rect = text.get_rect(center=(400, y))
             screen.blit(text, text_rect)
-            
-            # Show instruction
-            instruction = """
-            Q: Start Quest
-            SPACE: Collect Item
-            M: Play Mini Game
-            L: Show Leaderboard
-            E: Complete Quest
-            R: Record globe data
-            G: Display globe data
-            P: Display community challenges
-            """
-            lines = instruction.strip().splitlines()
-            y = 150
-            rect = pygame.Rect(234, y - 15, 400, len(lines) * 30)
-            pygame.draw.rect(screen, (211,211,211), rect)
-            for i, line in enumerate(lines):
-                text = font.render(line, True, FONT_COLOR)
-                text_rect = text.get_rect(center=(400, y))
-                screen.blit(text, text_rect)
-                y += 30
-
-            pygame.display.flip()
-            for event in pygame.event.get():
-                if event.type == QUIT:
+            y += 30
+        return None, None
+
+    def static_screen(self, name, compose, version=None):
+        """Show a screen that only changes when invalidated; yields the actions of its input.
+
+        compose() draws the screen on the canvas and returns (backdrop image
+        key or None, regions) for flip(). The composed canvas is cached in
+        self.pages and shown again without redrawing until version() (if
+        given) returns something new. Between inputs the loop blocks in
+        pygame.event.wait rather than spinning, waking every
+        PAGE_REFRESH_MS to check version(); the page is repainted only after
+        an action (the caller may have drawn over it) or a window event.
+        """
+        state = version() if version else None
+        self.show_page(name, compose, state)
+        while True:
+            repaint = False
+            for event in self.poll_events(PAGE_REFRESH_MS):
+                action = self.controls.action(event)
+                if action == "quit":
                     pygame.quit()
                     exit()
-                if event.type == KEYDOWN:
-                    if event.key == K_b:
-                        return
+                if action:
+                    yield action
+                    repaint = True
+                elif event.type in WINDOW_EVENTS:
+                    repaint = True
+            if version and version() != state:
+                state = version()
+                repaint = True
+            if repaint:
+                self.show_page(name, compose, state)
+
+    def show_page(self, name, compose, state):
+        page = self.pages.get(name)
+        if page is None or page[0] != state:
+            backdrop_key, regions = compose()
+            page = self.pages[name] = (state, screen.copy(), backdrop_key, regions)
+        else:
+            screen.blit(page[1], (0, 0))
+        _, _, backdrop_key, regions = page
+        backdrop = display.layer(backdrop_key, self.images[backdrop_key]) if backdrop_key else None
+        self.flip(backdrop, regions)
+
     def handle_events(self):
         """Handle user input events."""
-        for event in pygame.event.get():
-            if event.type in (QUIT, KEYDOWN) and (event.type == QUIT or event.key == K_ESCAPE):
+        for event in self.poll_events():
+            action = self.controls.action(event)
+            if action == "quit":
                 self.running = False
-
-            elif event.type == KEYDOWN:
-                self.process_key(event.key)
+            elif action in self.actions:
+                KEY_ACTIONS.labels(action).inc()
+                self.actions[action]()
     def record_globe_data(self):
         """Record globe data collected by the player."""
         # Example of adding globe data entry
         entry = {
             "type": "Plastic Waste",
-            "value": random.randint(1, 10),  # Randomly generated value for demonstration
+            "value": self.rng.randint(1, 10),  # Randomly generated value for demonstration
             "location": self.current_environment_name
         }
         self.gloabe_data_entries.append(entry)
+        self.environment.report_globe_data(entry["location"], entry["value"])
         print(f"Recorded data: {entry}")
 
+    @in_scene("page")
     def display_globe_data(self):
         """Display globe data collected by the player."""
-        globe_data_window = pygame.display.set_mode((800, 380))
-        pygame.display.set_caption("Globe Data")
+        display.set_caption("Globe Data")
+        for action in self.static_screen("globe_data", self.compose_globe_data,
+                                         lambda: len(self.gloabe_data_entries)):
+            if action == "back":
+                display.set_caption("EcoQuest: Global Guardians")
+                return
+
+    def compose_globe_data(self):
+        globe_data_window = screen
+        globe_data_window.fill((0, 0, 0))
         globe_data_window.blit(self.images["community_challenge"], (0, 0))
-        font = pygame.font.Font(None, 32)
+        font = get_font(32)
         return_txt= font.render("Press B to return", True, DARK_BLUE)
         pygame.draw.rect(globe_data_window, (211,211,211), (300, 8, 180, 25))
         globe_data_window.blit(return_txt, (300, 10))
@@ -215,88 +625,48 @@ class EcoQuestGame:
         for index, entry in enumerate(globe_data_texts):
             globe_data_text = font.render(entry, True, (0, 0, 0))
             globe_data_window.blit(globe_data_text, (70, 60 + index * 30))
-        pygame.display.flip()
-        while True:
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == KEYDOWN and event.key == K_b:
-                    pygame.display.set_mode((800, 600))
-                    return
-                     
+        return None, None
     
+    @in_scene("page")
     def show_leaderboard(self):
         """Show leaderboard on a new screen."""
-        while True:
-            screen.fill(WHITE)
-            font = pygame.font.Font(None, 32)
-            leaderboard_texts = [f"{name}: {score}" for name, score in sorted(self.leaderboard.items(), key=lambda x: x[1], reverse=True)]
-        
-            for index, entry in enumerate(leaderboard_texts):
-                leader_text = font.render(entry, True, (0, 0, 0))
-                screen.blit(leader_text, (50, 50 + index * 30))
-
-            return_button = font.render("Press B to return", True, DARK_BLUE)
-            screen.blit(return_button, (50, 50 + len(leaderboard_texts) * 30 + 20))
-        
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == KEYDOWN:
-                    if event.key == K_b:
-                        return  # Return to main game loop
-
-
-    def process_key(self, key):
-        """Process key inputs."""
-        if key == K_q:
-            self.start_quest()  
-            total_points = self.player_score          
-            player_name = "sky"   # Update leaderboard with player name
-            if  total_points > self.leaderboard[player_name]:
-                    self.leaderboard[player_name] = total_points
-                    self.save_leaderboard()      
-        elif key == K_SPACE:
-            self.collect_item()
-        elif key == K_m:
-            self.start_mini_game() 
-        elif key == K_l:  # Press L to show leaderboard
-            self.show_leaderboard()
-        elif key == K_e:  # Press E to complete the current quest
-            self.complete_current_quest()
-        elif key == K_r:
-            self.record_globe_data()
-        elif key == K_g:
-            self.display_globe_data()
-        elif key == K_p:
-            self.display_community_challenges()
+        for action in self.static_screen("leaderboard", self.compose_leaderboard, self.leaderboard_entries):
+            if action == "back":
+                return  # Return to main game loop
+
+    def leaderboard_entries(self):
+        """The shared top scores of all kiosks once synced, this machine's otherwise."""
+        if self.sync and self.sync.top_scores is not None:
+            return self.sync.top_scores
+        return sorted(self.leaderboard.items(), key=lambda x: x[1], reverse=True)
+
+    def compose_leaderboard(self):
+        screen.fill(WHITE)
+        font = get_font(32)
+        leaderboard_texts = [f"{name}: {score}" for name, score in self.leaderboard_entries()]
     
+        for index, entry in enumerate(leaderboard_texts):
+            leader_text = font.render(entry, True, (0, 0, 0))
+            screen.blit(leader_text, (50, 50 + index * 30))
+
+        return_button = font.render("Press B to return", True, DARK_BLUE)
+        screen.blit(return_button, (50, 50 + len(leaderboard_texts) * 30 + 20))
+        return None, None
+
+    def take_quest(self):
+        """Start the next quest and put the score on the leaderboard."""
+        self.start_quest()
+        total_points = self.player_score
+        player_name = "sky"   # Update leaderboard with player name
+        if total_points > self.leaderboard.get(player_name, 0):
+            self.leaderboard[player_name] = total_points
+            self.save_leaderboard()
+            if self.sync:
+                self.sync.submit_score(player_name, total_points)
+
     def start_quests_in_order(self):
         """Sequentially run quests based on the current environment."""
-        if self.level < 3:  # Urban
-            urban_quests = [
-                {"task": "Collect 3 recyclable items", "reward": 25, "completed": False, "minigame": "sort_trash_mini_game"},
-                {"task": "Educate 3 friends about recycling", "reward": 50, "completed": False, "minigame": "recycling_quiz_mini_game"},
-            ]
-            return urban_quests
-
-        elif self.level >= 3 and self.level < 6:  # Ocean
-            ocean_quests = [
-                {"task": "Help clean up the beach", "reward": 50, "completed": False},
-                {"task": "Recognize plastic waste", "reward": 100, "completed": False}
-            ]
-            return ocean_quests
-
-        elif self.level >= 6:  # Forest
-            forest_quests = [
-                {"task": "Find the Hidden Trees!", "reward": 100, "completed": False},
-                {"task": "Identify wildlife habitats", "reward": 75, "completed": False},
-            ]
-            return forest_quests
+        return ECONOMY.quests_for_level(self.level)
 
     def start_quest(self):
         """Start a new quest and return the reward points."""
@@ -309,6 +679,7 @@ class EcoQuestGame:
         if self.current_quests:  # Check if there are any quests available
             current_quest = self.current_quests[0]  # Get the first quest in the list
             self.quest_message = f"Quest: {current_quest['task']}"  # Set the message for the current quest
+            self.quest_started.setdefault(current_quest["task"], time.monotonic())
 
             # If this quest is completed, remove it from the list
             if current_quest["completed"]:
@@ -333,26 +704,26 @@ class EcoQuestGame:
             times_completed = 0
         
             # Loop until we collect 3 recyclable items
-            while times_completed < 3:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.sort_trash_mini_game():  # Assume this returns True upon success
                     times_completed += 1
-                    font=pygame.font.Font(None, 36)
-                    txt_1=font.render(f"Successfully Collected Recyclable Items! Attempts so far: {times_completed}/3", True, FONT_COLOR)
-                    screen.blit(txt_1, (50, 350))
-                    pygame.display.flip()
-                    pygame.time.delay(1200)
+                    txt_1=TEXT.render(f"Successfully Collected Recyclable Items! Attempts so far: {times_completed}/3", 36, 700, FONT_COLOR, background=PANEL, padding=6)
+                    screen.blit(txt_1, (50, on_canvas(txt_1, 350)))
+                    self.flip()
+                    self.delay(1200)
 
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 10
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            rew_txt__1=font.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", True, FONT_COLOR)
-            screen.blit(rew_txt__1, (50, 520))
-            pygame.display.flip()
-            pygame.time.delay(1200)
-            self.sounds["correct"].play()
+            rew_txt__1=TEXT.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", 32, 700, FONT_COLOR, background=PANEL, padding=6)
+            screen.blit(rew_txt__1, (50, on_canvas(rew_txt__1, 520)))
+            self.flip()
+            self.play_effects(1200)
+            self.sounds.play("correct")
             self.current_quests.pop(0)
             self.quest_message = ""
             self.start_quest() 
@@ -363,27 +734,27 @@ class EcoQuestGame:
             times_completed = 0
         
             
-            while times_completed < 3:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.recycling_quiz_min_game():  # Assume this returns True upon success
                     times_completed += 1
-                    font=pygame.font.Font(None, 36)
-                    txt_2=font.render(f"Successfully educated Friend ! Attempts so far: {times_completed}/3", True, FONT_COLOR)
-                    screen.blit(txt_2, (50, 350))
-                    pygame.display.flip()
-                    pygame.time.delay(1200)
+                    txt_2=TEXT.render(f"Successfully educated Friend ! Attempts so far: {times_completed}/3", 36, 700, FONT_COLOR, background=PANEL, padding=6)
+                    screen.blit(txt_2, (50, on_canvas(txt_2, 350)))
+                    self.flip()
+                    self.delay(1200)
                    
 
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 10
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            rew_txt_2=font.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", True, FONT_COLOR)
-            screen.blit(rew_txt_2, (10, 520))
-            pygame.display.flip()
-            pygame.time.delay(1200)
-            self.sounds["correct"].play()
+            rew_txt_2=TEXT.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", 32, 700, FONT_COLOR, background=PANEL, padding=6)
+            screen.blit(rew_txt_2, (10, on_canvas(rew_txt_2, 520)))
+            self.flip()
+            self.play_effects(1200)
+            self.sounds.play("correct")
             self.current_quests.pop(1)
             self.quest_message = ""
             self.start_quest() 
@@ -392,29 +763,29 @@ class EcoQuestGame:
             times_completed = 0
         
             
-            while times_completed < 3:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.clean_beach_mini_game():  # Assume this returns True upon success
                     times_completed += 1
-                    font=pygame.font.Font(None, 36)
-                    txt_3=font.render(f"Successfully Cleaned ! Attempts so far: {times_completed}/3", True, FONT_COLOR)
-                    screen.blit(txt_3, (50, 450))
-                    pygame.display.flip()
-                    pygame.time.delay(1200)
+                    txt_3=TEXT.render(f"Successfully Cleaned ! Attempts so far: {times_completed}/3", 36, 700, FONT_COLOR, background=PANEL, padding=6)
+                    screen.blit(txt_3, (50, on_canvas(txt_3, 450)))
+                    self.flip()
+                    self.delay(1200)
 
 
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 75
-            if self.exp > self.level_up_exp:
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
+            if ECONOMY.quest_levels_up(current_quest["task"], self.exp, self.level_up_exp):
                 self.level_up()
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            rew_txt_3=font.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", True, FONT_COLOR)
-            screen.blit(rew_txt_3, (10, 540))
-            pygame.display.flip()
-            pygame.time.delay(1200)
-            self.sounds["correct"].play()
+            rew_txt_3=TEXT.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", 32, 700, FONT_COLOR, background=PANEL, padding=6)
+            screen.blit(rew_txt_3, (10, on_canvas(rew_txt_3, 540)))
+            self.flip()
+            self.play_effects(1200)
+            self.sounds.play("correct")
             self.current_quests.pop(0)
             self.quest_message = ""
             self.start_quest() 
@@ -423,29 +794,29 @@ class EcoQuestGame:
             times_completed = 0
         
             
-            while times_completed < 1:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.clean_neighborhood_mini_game():  # Assume this returns True upon success
                     times_completed += 1
-                    font=pygame.font.Font(None, 36)
-                    txt_4=font.render(f"Successfully Recognized ! Attempts so far: {times_completed}/1", True, FONT_COLOR)
-                    screen.blit(txt_4, (50, 250))
-                    pygame.display.flip()
-                    pygame.time.delay(1200)
+                    txt_4=TEXT.render(f"Successfully Recognized ! Attempts so far: {times_completed}/1", 36, 700, FONT_COLOR, background=PANEL, padding=6)
+                    screen.blit(txt_4, (50, on_canvas(txt_4, 250)))
+                    self.flip()
+                    self.delay(1200)
                    
 
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 75
-            if self.exp > self.level_up_exp:
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
+            if ECONOMY.quest_levels_up(current_quest["task"], self.exp, self.level_up_exp):
                 self.level_up()
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            rew_txt_4=font.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", True, FONT_COLOR)
-            screen.blit(rew_txt_4, (10, 450))
-            pygame.display.flip()
-            pygame.time.delay(1200)
-            self.sounds["correct"].play()
+            rew_txt_4=TEXT.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", 32, 700, FONT_COLOR, background=PANEL, padding=6)
+            screen.blit(rew_txt_4, (10, on_canvas(rew_txt_4, 450)))
+            self.flip()
+            self.play_effects(1200)
+            self.sounds.play("correct")
             self.current_quests.pop(1)
             self.quest_message = ""
             self.start_quest()
@@ -454,7 +825,7 @@ class EcoQuestGame:
             times_completed = 0
         
             
-            while times_completed < 1:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.plant_trees_mini_game():  # Assume this returns True upon success
                     times_completed += 1
                     
@@ -463,12 +834,13 @@ class EcoQuestGame:
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 75
-            if self.exp > self.level_up_exp:
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
+            if ECONOMY.quest_levels_up(current_quest["task"], self.exp, self.level_up_exp):
                 self.level_up()
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            self.sounds["correct"].play()
+            self.sounds.play("correct")
             self.current_quests.pop(0)
             self.quest_message = ""
             self.start_quest()
@@ -477,51 +849,42 @@ class EcoQuestGame:
             times_completed = 0
         
             
-            while times_completed < 3:
+            while times_completed < ECONOMY.quest_mini_games[current_quest["task"]][1]:
                 if self.match_habitat_mini_game():  # Assume this returns True upon success
                     times_completed += 1
-                    font=pygame.font.Font(None, 36)
-                    txt_6=font.render(f"Successfully Matched ! Attempts so far: {times_completed}/3", True, FONT_COLOR)
-                    screen.blit(txt_6, (50, 350))
-                    pygame.display.flip()
-                    pygame.time.delay(1200)
+                    txt_6=TEXT.render(f"Successfully Matched ! Attempts so far: {times_completed}/3", 36, 700, FONT_COLOR, background=PANEL, padding=6)
+                    screen.blit(txt_6, (50, on_canvas(txt_6, 350)))
+                    self.flip()
+                    self.delay(1200)
                    
 
 
             # After achieving 3 successful attempts
             current_quest["completed"] = True
-            self.exp += 85
-            if self.exp > self.level_up_exp:
+            self.environment.clean_up(self.current_environment_name, ECONOMY.quest_clean_up)
+            self.quest_completed(current_quest)
+            self.exp += ECONOMY.quest_exp[current_quest["task"]]
+            if ECONOMY.quest_levels_up(current_quest["task"], self.exp, self.level_up_exp):
                 self.level_up()
             self.player_score += current_quest['reward']
-            font=pygame.font.Font(None, 32)
-            rew_txt_6=font.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", True, FONT_COLOR)
-            screen.blit(rew_txt_6, (50, 520))
-            pygame.display.flip()
-            pygame.time.delay(1200)
-            self.sounds["correct"].play()
-            pygame.time.delay(2000)
-            """Display game over message and final score."""
-            screen.fill(RED)
-            game_over_text=pygame.font.Font(None ,74).render("Game Over!" , True , WHITE)
-            score_text=pygame.font.Font(None ,36).render(f"Final Score: {self.player_score}" , True , WHITE)
-
-            screen.blit(game_over_text,(250 ,250))
-            screen.blit(score_text,(300 ,350))
-         
-            pygame.display.flip()
-            pygame.time.delay(3000)  
-            self.running=False
+            rew_txt_6=TEXT.render(f"Completed Quest: {current_quest['task']}! You earned {current_quest['reward']} points.", 32, 700, FONT_COLOR, background=PANEL, padding=6)
+            screen.blit(rew_txt_6, (50, on_canvas(rew_txt_6, 520)))
+            self.flip()
+            self.play_effects(1200)
+            self.sounds.play("correct")
+            self.delay(2000)
+            self.game_finished = True
+            self.game_over()
 
     
 
+    @mini_game("plant_trees", "pointer")
     def plant_trees_mini_game(self):
         """Mini-game for planting trees in a local park with enhanced feedback."""
-        screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Find the Hidden Trees!")
-        background = self.images["forest_background"]
+        display.set_caption("Find the Hidden Trees!")
+        background = self.images.sized("forest_background", screen.get_size())
         screen.blit(background, (0, 0))
-        pygame.display.flip()
+        self.flip()
 
         tree_image = self.images["tree"]
         tree_width, tree_height = tree_image.get_size()
@@ -537,105 +900,113 @@ class EcoQuestGame:
         placed_trees = []
 
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            for event in self.poll_events():
+                action = self.controls.action(event)
+                if action == "quit":
                     pygame.quit()
                     exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif action == "click":
                     x, y = event.pos
                     for place in correct_answer_places:
                         if place[0] < x < place[0] + tree_width and place[1] < y < place[1] + tree_height:
                             screen.blit(tree_image, place)
                             placed_trees.append(place)
-                            pygame.display.flip()
+                            self.flip()
                             if len(placed_trees) == len(correct_answer_places):
                                 for place in correct_answer_places:
                                     screen.blit(correct_answer_image, (place[0] + (tree_width - correct_answer_width) // 2, place[1] + (tree_height - correct_answer_height) // 2))
-                                pygame.display.flip()
-                                pygame.time.delay(2000)
-                                self.player_score += 100
-                                self.exp += 10
-                                if self.environment_health<1000:
-                                    self.environment_health += 50
+                                self.flip()
+                                self.delay(2000)
+                                points_awarded, exp_awarded = ECONOMY.mini_game_rewards["plant_trees"]
+                                self.player_score += points_awarded
+                                self.exp += exp_awarded
+                                self.heal_environment()
                                 if self.exp >= self.level_up_exp:
                                     self.level_up()
-                                    self.sounds["level_up"].play()
-                                if self.sounds["correct"]:
-                                    self.sounds["correct"].play()
-                                pygame.display.set_mode((800, 600))
+                                    self.sounds.play("level_up")
+                                self.sounds.play("correct")
                                 return True
 
+    @mini_game("clean_up_neighborhood", "pointer")
     def clean_neighborhood_mini_game(self):
         """Mini-game for cleaning up the neighborhood with enhanced feedback."""
         correct_answer = True
-        screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Clean up your enviorment")
+        display.set_caption("Clean up your enviorment")
         if self.level< 3:
-            background = self.images["urban_background"]
+            background = self.images.sized("urban_background", screen.get_size())
         elif self.level >= 3:
-            background = self.images["ocean_background"]
+            background = self.images.sized("ocean_background", screen.get_size())
         elif self.level >= 6:
-            background = self.images["forest_background"]
+            background = self.images.sized("forest_background", screen.get_size())
         screen.blit(background, (0, 0))
-        pygame.display.flip()
+        self.flip()
 
         waste = []
         for _ in range(6):
-            x = random.randint(10, 700)
-            y = random.randint(250, 500)
+            x = self.rng.randint(10, 700)
+            y = self.rng.randint(250, 500)
             waste.append((x, y))
             screen.blit(self.images["waste"], (x, y))
 
-        pygame.display.flip()
+        self.flip()
 
         while len(waste) > 0:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            for event in self.poll_events():
+                action = self.controls.action(event)
+                if action == "quit":
                     pygame.quit()
                     exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif action == "click":
                     for w in waste[:]:
                         if w[0] < event.pos[0] < w[0] + 100 and w[1] < event.pos[1] < w[1] + 100:
                             waste.remove(w)
                             screen.blit(self.images["correct"], (w[0], w[1]))
-                            pygame.display.flip()
-                            if self.sounds["correct"]:
-                                self.sounds["correct"].play()
+                            self.burst(w[0] + 50, w[1] + 50, 50, lifetime=0.6)
+                            self.flip()
+                            self.play_effects(400)
+                            self.sounds.play("correct")
 
         if correct_answer:
-            self.player_score += 75
-            self.exp += 10
-            if self.environment_health<1000:
-                self.environment_health += 50
+            points_awarded, exp_awarded = ECONOMY.mini_game_rewards["clean_up_neighborhood"]
+            self.player_score += points_awarded
+            self.exp += exp_awarded
+            self.heal_environment()
             
             if self.exp >= self.level_up_exp:
                 self.level_up()
-                self.sounds["level_up"].play()
+                self.sounds.play("level_up")
             return True
 
     def level_up(self):
         """Increase player level and give them experience points."""
         self.level += 1
         self.exp = 0
-        self.level_up_exp = 10 * (self.level + 1)
+        LEVEL_UPS.inc()
+        LEVEL.set(self.level)
+        self.level_up_exp = ECONOMY.level_up_exp(self.level)
 
         if self.level == 3:
             self.current_environment_name = "Ocean"
         elif self.level == 6:
             self.current_environment_name = "Forest"
 
-        if self.environment_health<1000:
-            self.environment_health += 50
+        self.heal_environment()
         self.current_quests = self.start_quests_in_order()
 
 
+    def heal_environment(self):
+        """Restore some environment health after a good deed, up to the maximum."""
+        if self.environment_health < ECONOMY.max_health:
+            self.environment.heal(self.current_environment_name, ECONOMY.heal_amount)
+
     def collect_item(self):
         """Simulate collecting an item and update score."""
-        point_value = random.randint(1, 2)
+        point_value = self.rng.randint(*ECONOMY.collect_points)
         self.player_score += point_value
         self.exp += point_value
         print(f"Collected an item! Score: {self.player_score}")
-        self.sounds["item_collect"].play()
+        self.burst(120, 30, 40, speed=160.0, lifetime=0.8)
+        self.sounds.play("item_collect")
         if self.exp >= self.level_up_exp:
             self.level_up()
     
@@ -643,15 +1014,10 @@ class EcoQuestGame:
         """Start a randomly chosen mini-game with enhanced feedback."""
         previous_mini_game = None
     
-        if self.level < 3:
-            mini_game_choices = ["sort_trash", "recycling_quiz", "clean_up_neighborhood"]
-        elif self.level >= 3 and self.level < 10:
-            mini_game_choices = ["clean_up_neighborhood","clean_beach","match_habitat"]
-        else:
-            mini_game_choices = ["match_habitat", "clean_up_neighborhood", "plant_trees"]
+        mini_game_choices = eligible_mini_games(self.level)
     
         while True:
-            mini_game_choice = random.choice(mini_game_choices)
+            mini_game_choice = self.rng.choice(mini_game_choices)
             if mini_game_choice != previous_mini_game:
                 break
     
@@ -668,29 +1034,30 @@ class EcoQuestGame:
         elif mini_game_choice == "clean_beach":
             self.clean_beach_mini_game()
 
+    @mini_game("clean_beach", "pointer")
     def clean_beach_mini_game(self):
         """Mini-game for cleaning up the beach by dragging plastic bottles to a recycling bin."""
-        screen = pygame.display.set_mode((800, 600))
-        pygame.display.set_caption("Clean up the beach")
-        background = self.images["ocean_background"]
+        display.set_caption("Clean up the beach")
+        background = self.images.sized("ocean_background", screen.get_size())
         screen.blit(background, (0, 0))
-        pygame.display.flip()
+        self.flip()
         
         plastic_bottles = []
         for _ in range(1):
-            x = random.randint(0, 700)
-            y = random.randint(250, 500)
+            x = self.rng.randint(0, 700)
+            y = self.rng.randint(250, 500)
             plastic_bottles.append((x, y))
         
         recycle_bin = self.images["recycle_bin"]
         screen.blit(recycle_bin, (700, 250))
         
         while len(plastic_bottles) > 0:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            for event in self.poll_events():
+                action = self.controls.action(event)
+                if action == "quit":
                     pygame.quit()
                     exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif action == "click":
                     for bottle in plastic_bottles[:]:
                         if bottle[0] < event.pos[0] < bottle[0] + 100 and bottle[1] < event.pos[1] < bottle[1] + 100:
                             plastic_bottles.remove(bottle)
@@ -698,22 +1065,23 @@ class EcoQuestGame:
                                 screen.blit(background, (0, 0))
                                 screen.blit(recycle_bin, (700, 250))
                                 screen.blit(self.images["plastic_bottle"], (700, y))
-                                pygame.display.flip()
-                                pygame.time.delay(10)
+                                self.flip()
+                                self.delay(10)
                             screen.blit(self.images["correct"], (350, 250))
-                            pygame.display.flip()
-                            pygame.time.delay(2000)
-                            if self.environment_health<1000:
-                                self.environment_health += 50
-                            self.exp += 10
+                            self.burst(750, 280, 120, lifetime=1.0)
+                            self.flip()
+                            self.play_effects(2000)
+                            self.heal_environment()
+                            points_awarded, exp_awarded = ECONOMY.mini_game_rewards["clean_beach"]
+                            self.player_score += points_awarded
+                            self.exp += exp_awarded
                             if self.exp >= self.level_up_exp:
                                 self.level_up() 
-                            if self.sounds["correct"]:
-                                self.sounds["correct"].play()
+                            self.sounds.play("correct")
                             return True
             for bottle in plastic_bottles:
                 screen.blit(self.images["plastic_bottle"], bottle)
-            pygame.display.flip()
+            self.flip()
         
         self.completed_quests.append({"task": "Help clean up the beach", "reward": 50, "completed": True,})
 
@@ -722,6 +1090,38 @@ class EcoQuestGame:
 
 
 
+    def read_answer(self, draw_prompt):
+        """Show a question drawn by draw_prompt() with an answer box under it
+        and return the text the player enters. Only the box is redrawn as they type."""
+        box = TextInput(ANSWER_BOX, get_font(32), BLUE, to_window=display.to_window)
+        full = True
+        try:
+            while True:
+                for event in self.poll_events():
+                    action = self.controls.action(event)
+                    if action == "quit":
+                        pygame.quit()
+                        exit()
+                    if box.handle(event, action) == "submit":
+                        return box.text
+                    if event.type in WINDOW_EVENTS:
+                        full = True
+                if full:
+                    draw_prompt()
+                    box.invalidate()
+                    box.draw(screen)
+                    self.flip()
+                    full = False
+                    continue
+                regions = box.draw(screen)
+                if regions:
+                    self.flip_regions(regions)
+                else:
+                    self.delay(10)
+        finally:
+            box.focus(False)
+
+    @mini_game("sort_trash", "text_input")
     def sort_trash_mini_game(self):
         """Mini-game for sorting trash items with improved feedback."""
         correct_items = ["plastic bottle", "glass", "paper", "cardboard", "battery", "newspaper", 
@@ -730,75 +1130,41 @@ class EcoQuestGame:
                      "leather", "ceramic", "porcelain"]
 
         print("Mini-Game: Give name of Recyclable Objects!")
-        input_box = pygame.Rect(250, 300, 140, 32)
-    
-        color_inactive = pygame.Color('lightskyblue3')
-        color_active = pygame.Color('dodgerblue2')
-        active = False
-        text = ''
-    
-        font = pygame.font.Font(None, 32)
-
-        while True:
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                if event.type == KEYDOWN and active:
-                    if event.key == K_RETURN:
-                        if text.strip().lower() in correct_items:  # Normalize input for comparison
-                            print("Correct! You earn extra points!")
-                            points_awarded = 50
-                            self.exp += 10
-                            if self.environment_health < 1000:
-                                self.environment_health += 50
-                            self.player_score += points_awarded
-                            if self.exp >= self.level_up_exp:
-                                self.level_up()
-                                self.sounds["level_up"].play()
-                            if self.sounds["correct"]:
-                                self.sounds["correct"].play()
-                            screen.blit(self.images["correct"], (280, 380))
-                            pygame.display.flip()
-                            pygame.time.delay(2000) 
-                            return True  # Indicate success
-                        else:
-                            print("Incorrect! Try again.")
-                            if self.sounds["incorrect"]:
-                                self.sounds["incorrect"].play()
-                            screen.blit(self.images["incorrect"], (280, 380))
-                            pygame.display.flip()
-                            pygame.time.delay(2000) 
-                            return False  # Indicate failure
-
-                    elif event.key == K_BACKSPACE:
-                        text = text[:-1]
-                    else:
-                        text += event.unicode
-            
-                if event.type == MOUSEBUTTONDOWN:
-                    if input_box.collidepoint(event.pos):
-                        active = not active
-                    else:
-                        active = False
-            
-                color = color_active if active else color_inactive
-            
-                screen.fill(BLUE)
-                txt_surface = font.render(text, True, color)
-                width = max(200, txt_surface.get_width() + 10)
-                input_box.w = width
-
-                screen.blit(self.images["plastic_bottle"], (250, 100))
-                instructions = font.render("Type Name of Recyclable item:", True, WHITE)
-                screen.blit(instructions, (220, 250))  
-            
-                screen.blit(txt_surface, (input_box.x + 5, input_box.y + 5))
-                pygame.draw.rect(screen, color, input_box, 2)
-
-                pygame.display.flip()
+        font = get_font(32)
+
+        def draw_prompt():
+            screen.fill(BLUE)
+            screen.blit(self.images["plastic_bottle"], (250, 100))
+            instructions = font.render("Type Name of Recyclable item:", True, WHITE)
+            screen.blit(instructions, (220, above_answer_box(instructions)))
+
+        text = self.read_answer(draw_prompt)
+        if text.strip().lower() in correct_items:  # Normalize input for comparison
+            print("Correct! You earn extra points!")
+            QUIZ_ANSWERS.labels("sort_trash", "recyclable item", "correct").inc()
+            points_awarded, exp_awarded = ECONOMY.mini_game_rewards["sort_trash"]
+            self.exp += exp_awarded
+            self.heal_environment()
+            self.player_score += points_awarded
+            if self.exp >= self.level_up_exp:
+                self.level_up()
+                self.sounds.play("level_up")
+            self.sounds.play("correct")
+            screen.blit(self.images["correct"], (280, 380))
+            self.flip()
+            self.delay(2000) 
+            return True  # Indicate success
+        else:
+            print("Incorrect! Try again.")
+            QUIZ_ANSWERS.labels("sort_trash", "recyclable item", "incorrect").inc()
+            self.sounds.play("incorrect")
+            screen.blit(self.images["incorrect"], (280, 380))
+            self.flip()
+            self.delay(2000) 
+            return False  # Indicate failure
 
 
+    @mini_game("match_habitat", "text_input")
     def match_habitat_mini_game(self):
        """Mini-game for matching animals to their habitats with enhanced feedback."""
        habitats = {
@@ -825,77 +1191,42 @@ class EcoQuestGame:
            "sloth": "rainforest",
            "flamingo": "coastal wetland"
        }
-       animal = random.choice(list(habitats.keys()))
+       animal = self.rng.choice(list(habitats.keys()))
     
        print(f"Mini-Game: Where does the {animal} live?")
     
-       input_box = pygame.Rect(250, 300, 140, 32)
-       color_inactive = pygame.Color('lightskyblue3')
-       color_active = pygame.Color('dodgerblue2')
-       active = False
-       text = ''
-       font = pygame.font.Font(None, 32)
-
-       while True:
-           for event in pygame.event.get():
-               if event.type == QUIT:
-                   pygame.quit()
-                   exit()
-               if event.type == KEYDOWN and active:
-                   if event.key == K_RETURN:
-                       if text.lower() == habitats[animal]:
-                           print("Correct! You earn extra points!")
-                           points_awarded=50
-                           self.exp += 10
-                           if self.environment_health<1000:
-                               self.environment_health += 50
-                           self.player_score += points_awarded
-                           if self.exp >= self.level_up_exp:
-                               self.level_up()
-                               self.sounds["level_up"].play()
-                           if self.sounds["correct"]:
-                               self.sounds["correct"].play()
-                           screen.blit(self.images["correct"], (280, 380))
-                           pygame.display.flip()
-                           pygame.time.delay(2000)
-                           return True 
-                       else:
-                           print("Incorrect! Try again.")
-                           if self.sounds["incorrect"]:
-                               self.sounds["incorrect"].play()
-                           screen.blit(self.images["incorrect"], (280, 380))
-                           pygame.display.flip()
-                           pygame.time.delay(2000)
-                           return False 
-                       return 
-                   elif event.key == K_BACKSPACE:
-                       text=text[:-1]
-                   else:
-                       text += event.unicode
-            
-               if event.type == MOUSEBUTTONDOWN:
-                   if input_box.collidepoint(event.pos):
-                       active= not active
-                   else:
-                       active=False
-            
-               color=color_active if active else color_inactive
-            
-               screen.fill(BLUE)
-               instructions=font.render(f"Where does the {animal} live? Type your answer:", True , WHITE)
-               screen.blit(instructions , (200 ,250))  
-               
-               screen.blit(self.images["animal_habitat"], (250, 100))
-
-               txt_surface=font.render(text , True , color)
-               width=max(200 ,txt_surface.get_width()+10)
-               input_box.w=width
-            
-               screen.blit(txt_surface , (input_box.x+5 ,input_box.y+5))
-               pygame.draw.rect(screen ,color ,input_box ,2)
-
-               pygame.display.flip()
-
+       def draw_prompt():
+           screen.fill(BLUE)
+           instructions=TEXT.render(f"Where does the {animal} live? Type your answer:", 32 , 580 , WHITE)
+           screen.blit(instructions, (200, above_answer_box(instructions)))
+           screen.blit(self.images["animal_habitat"], (250, 100))
+
+       text = self.read_answer(draw_prompt)
+       if text.lower() == habitats[animal]:
+           print("Correct! You earn extra points!")
+           QUIZ_ANSWERS.labels("match_habitat", animal, "correct").inc()
+           points_awarded, exp_awarded = ECONOMY.mini_game_rewards["match_habitat"]
+           self.exp += exp_awarded
+           self.heal_environment()
+           self.player_score += points_awarded
+           if self.exp >= self.level_up_exp:
+               self.level_up()
+               self.sounds.play("level_up")
+           self.sounds.play("correct")
+           screen.blit(self.images["correct"], (280, 380))
+           self.flip()
+           self.delay(2000)
+           return True 
+       else:
+           print("Incorrect! Try again.")
+           QUIZ_ANSWERS.labels("match_habitat", animal, "incorrect").inc()
+           self.sounds.play("incorrect")
+           screen.blit(self.images["incorrect"], (280, 380))
+           self.flip()
+           self.delay(2000)
+           return False 
+
+    @mini_game("recycling_quiz", "text_input")
     def recycling_quiz_min_game(self):
        """Mini-game quiz about recycling with improved questions and feedback."""
        questions_and_answers = {
@@ -914,81 +1245,46 @@ class EcoQuestGame:
            "What is the most effective way to reduce waste?": ["Reduce", "Reuse"],
            "What is the least effective way to reduce waste?": ["Recycle", "Dispose of it properly"]
        }
-       question, answers = random.choice(list(questions_and_answers.items()))
-
-       input_box = pygame.Rect(250, 300, 140, 32)
-       color_inactive = pygame.Color('lightskyblue3')
-       color_active = pygame.Color('dodgerblue2')
-    
-       active = False
-       text = ''
-    
-       font = pygame.font.Font(None, 32)
-
-       while True:
-           for event in pygame.event.get():
-               if event.type == QUIT:
-                   pygame.quit()
-                   exit()
-               if event.type == KEYDOWN and active:
-                   correct_answer_index = answers.index([a for a in answers if a.lower() == questions_and_answers[question][0].lower()][0])
-                   if event.key== K_RETURN:
-                       if text.lower() == answers[correct_answer_index].lower():
-                           print("Correct! You earn extra points!")
-                           points_awarded=50
-                           self.exp += 10
-                           if self.environment_health<1000:
-                                self.environment_health += 50
-                           self.player_score += points_awarded
-                           if self.exp >= self.level_up_exp:
-                               self.level_up()
-                               self.sounds["level_up"].play()
-                           if self.sounds["correct"]:
-                               self.sounds["correct"].play()
-                           screen.blit(self.images["correct"], (280 ,380)) 
-                           pygame.display.flip() 
-                           pygame.time.delay(2000)
-                           return True 
-                       else:
-                           print("Incorrect! Try again.")
-                           if self.sounds["incorrect"]:
-                               self.sounds["incorrect"].play()
-                           screen.blit(self.images["incorrect"], (280 ,380))  
-                           pygame.display.flip() 
-                           pygame.time.delay(2000)
-                           return False 
-                        
-                   elif event.key == K_BACKSPACE:
-                       text=text[:-1]
-                   else:
-                       text += event.unicode
-            
-               if event.type == MOUSEBUTTONDOWN:
-                   if input_box.collidepoint(event.pos):
-                       active= not active
-                   else:
-                       active=False
-            
-               color=color_active if active else color_inactive
-            
-               screen.fill(BLUE)
-               instructions=font.render(f"{question} Type your answer:", True , WHITE)
-               screen.blit(self.images["plastic_bottle"], (250, 100))
-               screen.blit(self.images["recycle_bin"], (300, 100))
-               screen.blit(instructions , (60 ,250))  
-            
-               txt_surface=font.render(text , True , color)
-               width=max(200 ,txt_surface.get_width()+10)
-               input_box.w=width
-            
-               screen.blit(txt_surface , (input_box.x+5 ,input_box.y+5))
-               pygame.draw.rect(screen ,color ,input_box ,2)
-
-               # Refresh the display.
-               pygame.display.flip()
+       question, answers = self.rng.choice(list(questions_and_answers.items()))
+
+       correct_answer_index = answers.index([a for a in answers if a.lower() == questions_and_answers[question][0].lower()][0])
+
+       def draw_prompt():
+           screen.fill(BLUE)
+           instructions=TEXT.render(f"{question} Type your answer:", 32 , 680 , WHITE)
+           screen.blit(self.images["plastic_bottle"], (250, 100))
+           screen.blit(self.images["recycle_bin"], (300, 100))
+           screen.blit(instructions, (60, above_answer_box(instructions)))
+
+       text = self.read_answer(draw_prompt)
+       if text.lower() == answers[correct_answer_index].lower():
+           print("Correct! You earn extra points!")
+           QUIZ_ANSWERS.labels("recycling_quiz", question, "correct").inc()
+           points_awarded, exp_awarded = ECONOMY.mini_game_rewards["recycling_quiz"]
+           self.exp += exp_awarded
+           self.heal_environment()
+           self.player_score += points_awarded
+           if self.exp >= self.level_up_exp:
+               self.level_up()
+               self.sounds.play("level_up")
+           self.sounds.play("correct")
+           screen.blit(self.images["correct"], (280 ,380)) 
+           self.flip() 
+           self.delay(2000)
+           return True 
+       else:
+           print("Incorrect! Try again.")
+           QUIZ_ANSWERS.labels("recycling_quiz", question, "incorrect").inc()
+           self.sounds.play("incorrect")
+           screen.blit(self.images["incorrect"], (280 ,380))  
+           self.flip() 
+           self.delay(2000)
+           return False 
     
     def community_challenges(self):
       """Start a community challenge and give rewards upon completion with enhanced feedback."""
+      if self.sync and self.sync.challenges:
+          return self.sync.challenges
       challenges=[
           {"challenge":"Reduce plastic waste by collecting litter in your area!"},
           {"challenge":"Plant trees in your local park!"},
@@ -997,12 +1293,21 @@ class EcoQuestGame:
           {"challenge":"Plant trees in your local park!"},
       ]
       return challenges
+    @in_scene("page")
     def display_community_challenges(self):
         """Display community challenges."""
-        community_window = pygame.display.set_mode((800, 380))
-        pygame.display.set_caption("Community challenge")
+        display.set_caption("Community challenge")
+        for action in self.static_screen("community", self.compose_community_challenges,
+                                         self.community_challenges):
+            if action == "back":
+                display.set_caption("EcoQuest: Global Guardians")
+                return
+
+    def compose_community_challenges(self):
+        community_window = screen
+        community_window.fill((0, 0, 0))
         community_window.blit(self.images["community_challenge"], (0, 0))
-        font = pygame.font.Font(None, 30)
+        font = get_font(30)
         return_1_txt= font.render("Press B to return", True, DARK_BLUE)
         pygame.draw.rect(community_window, (211,211,211), (300, 8, 180, 25))
         community_window.blit(return_1_txt, (300, 10))
@@ -1011,76 +1316,99 @@ class EcoQuestGame:
         for index, entry in enumerate(challenge_texts):
             globe_data_text = font.render(entry, True, (0, 0, 0))
             community_window.blit(globe_data_text, (75, 70 + index * 30))
-        pygame.display.flip()
-        while True:
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    exit()
-                elif event.type == KEYDOWN and event.key == K_b:
-                    pygame.display.set_mode((800, 600))
-                    return
+        return None, None
     
     def render(self):
          """Render game graphics on the screen."""
-         if not self.running:
+         if not self.running or self.headless:
              return
 
-         screen.blit(self.images[self.current_environment_name.lower() + "_background"], (0 ,0))
+         # The background gets hazier as the environment's health drops
+         background_key = self.current_environment_name.lower() + "_background"
+         background = self.visuals.background(background_key, self.environment_health,
+                                              ECONOMY.max_health, screen.get_size())
+         screen.blit(background, (0 ,0))
          
          # Display quest message  at the top of the UI.
-         font=pygame.font.Font(None ,40)
-         quest_text=font.render(self.quest_message , True , FONT_COLOR)
-         screen.blit(quest_text , (180 ,450))
+         quest_text=TEXT.render(self.quest_message , 40 , 600 , FONT_COLOR)
+         regions = [screen.blit(quest_text , (180 ,450))]
 
 
-         for index,popup in enumerate(self.educational_popups):
-             popup_text=font.render(popup , True , FONT_COLOR)
-             screen.blit(popup_text , (10 ,50 + index *30))
+         y = 110
+         for popup in self.educational_popups:
+             popup_text=TEXT.render(popup , 32 , 500 , FONT_COLOR , background=PANEL , padding=6)
+             regions.append(screen.blit(popup_text , (10 ,y)))
+             y += popup_text.get_height() + 6
 
          # Display score and health info clearly at the bottom of the UI.
-         self.display_info()
-         pygame.display.flip()
+         regions += self.display_info()
+
+         # Particle effects are drawn last, over the HUD
+         now = time.perf_counter()
+         self.effects.update(min(now - self.last_frame, 0.05))
+         self.last_frame = now
+         self.effects.draw()
+         effects_rect = self.effects.blit(screen)
+         if effects_rect:
+             regions.append(effects_rect)
+
+         # In a resized window (or with the texture renderer) the background comes
+         # ready from the cache and only the HUD regions are scaled this frame
+         backdrop = None
+         backdrop_size = display.backdrop_size
+         if backdrop_size:
+             backdrop = self.visuals.background(background_key, self.environment_health,
+                                                ECONOMY.max_health, backdrop_size)
+             if backdrop.get_size() != tuple(backdrop_size):
+                 backdrop = None
+         self.flip(backdrop, regions)
 
     def display_info(self):
-        """Display player's score, environmental health, and current level."""
-        font=pygame.font.Font(None ,36)
+        """Display player's score, environmental health, and current level.
+        Returns the screen rects drawn."""
+        font=get_font(36)
         score_text=font.render(f"Score: {self.player_score}" , True , FONT_COLOR)
         health_text=font.render(f"Environmental Health: {self.environment_health:.1f}" , True , FONT_COLOR)
         level_text=font.render(f"Level: {self.level} exp:{self.exp}/{self.level_up_exp}" , True , FONT_COLOR)
 
         # Draw a background rectangle to enhance visibility of score and health info.
         if self.level < 3 :
-            pygame.draw.rect(screen , (128,128,128) , (5 ,5 ,370 ,100))  
-            pygame.draw.rect(screen , (128,128,128) , (5 ,540 ,230 ,50))  
-            screen.blit(score_text,(10 ,10))
-            screen.blit(health_text,(10 ,50))
-            screen.blit(level_text,(10 ,550))
+            return [
+                pygame.draw.rect(screen , (128,128,128) , (5 ,5 ,370 ,100)),
+                pygame.draw.rect(screen , (128,128,128) , (5 ,540 ,230 ,50)),
+                screen.blit(score_text,(10 ,10)),
+                screen.blit(health_text,(10 ,50)),
+                screen.blit(level_text,(10 ,550)),
+            ]
         elif self.level >= 3:
-            pygame.draw.rect(screen , BLUE , (5 ,5 ,370 ,100))  
-            pygame.draw.rect(screen , BLUE , (5 ,540 ,230 ,50))
-            screen.blit(score_text,(10 ,10))
-            screen.blit(health_text,(10 ,50))
-            screen.blit(level_text,(10 ,550))
+            return [
+                pygame.draw.rect(screen , BLUE , (5 ,5 ,370 ,100)),
+                pygame.draw.rect(screen , BLUE , (5 ,540 ,230 ,50)),
+                screen.blit(score_text,(10 ,10)),
+                screen.blit(health_text,(10 ,50)),
+                screen.blit(level_text,(10 ,550)),
+            ]
         elif self.level >=6:
-            pygame.draw.rect(screen , (168,0,32) , (5 ,5 ,370 ,100))  
-            pygame.draw.rect(screen , (168,0,32) , (5 ,540 ,230 ,50))
-            screen.blit(score_text,(10 ,10))
-            screen.blit(health_text,(10 ,50))
-            screen.blit(level_text,(10 ,550))
+            return [
+                pygame.draw.rect(screen , (168,0,32) , (5 ,5 ,370 ,100)),
+                pygame.draw.rect(screen , (168,0,32) , (5 ,540 ,230 ,50)),
+                screen.blit(score_text,(10 ,10)),
+                screen.blit(health_text,(10 ,50)),
+                screen.blit(level_text,(10 ,550)),
+            ]
 
 
     def game_over(self):
          """Display game over message and final score."""
          screen.fill(RED)
-         game_over_text=pygame.font.Font(None ,74).render("Game Over!" , True , WHITE)
-         score_text=pygame.font.Font(None ,36).render(f"Final Score: {self.player_score}" , True , WHITE)
+         game_over_text=get_font(74).render("Game Over!" , True , WHITE)
+         score_text=get_font(36).render(f"Final Score: {self.player_score}" , True , WHITE)
 
          screen.blit(game_over_text,(250 ,250))
          screen.blit(score_text,(300 ,350))
          
-         pygame.display.flip()
-         pygame.time.delay(3000)  
+         self.flip()
+         self.delay(3000)  
          self.running=False
 
 # Entry point.
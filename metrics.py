@@ -0,0 +1,259 @@
+"""In-memory metrics for unattended kiosks, exported to local files.
+
+Counters, gauges and histograms are registered once on a Registry and
+aggregated in place: a histogram is a fixed list of bucket counts, and the
+number of label combinations is capped, so memory stays the same however
+long the game runs. MetricsExporter periodically writes the registry to
+PATH.prom (Prometheus text exposition format, for a node_exporter textfile
+collector or a scrape) and PATH.json.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+
+# Upper bounds in seconds; each histogram has one more (+Inf) bucket
+FRAME_BUCKETS = (0.002, 0.005, 0.008, 0.011, 0.017, 0.025, 0.033, 0.05, 0.1, 0.25, 1.0)
+DURATION_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1800)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+OVERFLOW_LABEL = "_other"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labels):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._series = {}
+
+    def labels(self, *values):
+        """The series for these label values; past the registry's cap they share one overflow series."""
+        values = tuple(str(value) for value in values)
+        series = self._series.get(values)
+        if series is None:
+            with self.registry.lock:
+                series = self._series.get(values)
+                if series is None:
+                    if not self.registry.reserve():
+                        values = (OVERFLOW_LABEL,) * len(self.label_names)
+                        series = self._series.get(values)
+                    if series is None:
+                        series = self._series[values] = self._new_series()
+        return series
+
+    def series(self):
+        with self.registry.lock:
+            return [(dict(zip(self.label_names, values)), series.value())
+                    for values, series in sorted(self._series.items())]
+
+
+class _CounterSeries:
+    __slots__ = ("lock", "count")
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.count = 0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.count += amount
+
+    def value(self):
+        return self.count
+
+
+class _GaugeSeries(_CounterSeries):
+    __slots__ = ()
+
+    def set(self, value):
+        self.count = value
+
+
+class _HistogramSeries:
+    __slots__ = ("lock", "bounds", "counts", "sum")
+
+    def __init__(self, lock, bounds):
+        self.lock = lock
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def value(self):
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {"buckets": buckets, "sum": self.sum, "count": cumulative}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries(self.registry.lock)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_series(self):
+        return _GaugeSeries(self.registry.lock)
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels, buckets):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(self.registry.lock, self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class Registry:
+    """All metrics of the process, with a cap on the total number of series."""
+
+    def __init__(self, max_series=512):
+        self.max_series = max_series
+        self.lock = threading.RLock()
+        self.metrics = {}
+        self._series_count = 0
+        self.started = time.time()
+
+    def reserve(self):
+        """Claim room for one more series; False once the cap is reached."""
+        if self._series_count >= self.max_series:
+            return False
+        self._series_count += 1
+        return True
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(self, name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(self, name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labels, buckets))
+
+    def to_prometheus(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in metric.series():
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_number(value)}")
+                    continue
+                for bound, count in value["buckets"]:
+                    bucket_labels = dict(labels, le=_format_number(bound))
+                    lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        metrics = {}
+        for metric in self.metrics.values():
+            series = []
+            for labels, value in metric.series():
+                if metric.kind == "histogram":
+                    value = dict(value, buckets={_format_number(bound): count for bound, count in value["buckets"]})
+                    series.append(dict(value, labels=labels))
+                else:
+                    series.append({"labels": labels, "value": value})
+            metrics[metric.name] = {"type": metric.kind, "help": metric.help, "series": series}
+        return json.dumps({"timestamp": time.time(), "started": self.started, "metrics": metrics}, indent=1)
+
+
+def _format_number(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def _write_text(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter(threading.Thread):
+    """Writes a registry to PATH.prom and PATH.json every `interval` seconds.
+
+    `reports` ({name: callable returning a dict}) are written alongside as
+    PATH.name.json. Formatting and the file writes happen on this thread;
+    files are replaced atomically so a collector never reads half an
+    export. stop() writes a final export.
+    """
+
+    def __init__(self, registry, path, interval=60.0, reports=None):
+        super().__init__(name="metrics-export", daemon=True)
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.reports = reports or {}
+        self._stop_event = threading.Event()
+
+    def export(self):
+        try:
+            _write_text(f"{self.path}.prom", self.registry.to_prometheus())
+            _write_text(f"{self.path}.json", self.registry.to_json())
+            for name, report in self.reports.items():
+                _write_text(f"{self.path}.{name}.json", json.dumps(report(), indent=1, sort_keys=True))
+        except OSError as e:
+            print(f"Metrics export failed: {e}")
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.export()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        self.export()
+
+
+# The process-wide registry; modules register their metrics on it at import
+REGISTRY = Registry()
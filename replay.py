@@ -0,0 +1,232 @@
+"""Deterministic input recording and replay for EcoQuest.
+
+Record a session:  ECOQUEST_RECORD=session.eqr python game.py
+Replay it:         python replay.py session.eqr
+
+A recording holds the RNG seed, a snapshot of the starting state, every
+input event the game reacted to (tagged with the frame it arrived on) and
+a snapshot of the final state. Replaying feeds the events back through
+handle_events and the mini-game loops headless and without delays, then
+checks that the game ends in exactly the recorded state.
+"""
+import os
+import struct
+import sys
+import time
+
+
+REPLAY_MAGIC = b"EQRP"
+REPLAY_VERSION = 3
+HEADER = struct.Struct("<4sHI")
+
+# Record tags; only the event types the game logic reads are recorded
+TAG_QUIT = 1
+TAG_KEYDOWN = 2
+TAG_MOUSEBUTTONDOWN = 3
+TAG_MOUSEBUTTONUP = 4
+TAG_TEXTINPUT = 5
+TAG_TEXTEDITING = 6  # version 3: TextInput will not submit while composing
+TAG_END = 255
+RECORD = struct.Struct("<BI")
+KEY = struct.Struct("<iH")
+MOUSE = struct.Struct("<hhB")
+
+
+class ReplayError(Exception):
+    """Raised when a recording cannot be read."""
+
+
+class ReplayMismatch(AssertionError):
+    """Raised when a replay does not end in the recorded state."""
+
+
+class ReplayFinished(Exception):
+    """Raised by ReplayEvents when the recording has no more input."""
+
+
+class Recorder:
+    """Appends the input events of a live session to a recording file."""
+
+    def __init__(self, path, seed, initial_state):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed))
+        self.file.write(struct.pack("<I", len(initial_state)) + initial_state)
+
+    def record(self, frame, events):
+        import pygame
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.file.write(RECORD.pack(TAG_QUIT, frame))
+            elif event.type == pygame.KEYDOWN:
+                text = event.unicode.encode("utf-8")[:255]
+                self.file.write(RECORD.pack(TAG_KEYDOWN, frame) + KEY.pack(event.key, event.mod)
+                                + bytes((len(text),)) + text)
+            elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                tag = TAG_MOUSEBUTTONDOWN if event.type == pygame.MOUSEBUTTONDOWN else TAG_MOUSEBUTTONUP
+                self.file.write(RECORD.pack(tag, frame) + MOUSE.pack(event.pos[0], event.pos[1], event.button))
+            elif event.type == pygame.TEXTINPUT:
+                text = event.text.encode("utf-8")[:255]
+                self.file.write(RECORD.pack(TAG_TEXTINPUT, frame) + bytes((len(text),)) + text)
+            elif event.type == pygame.TEXTEDITING:
+                text = event.text.encode("utf-8")[:255]
+                self.file.write(RECORD.pack(TAG_TEXTEDITING, frame) + bytes((len(text),)) + text)
+
+    def close(self, frame, final_state):
+        if self.file.closed:
+            return
+        self.file.write(RECORD.pack(TAG_END, frame))
+        self.file.write(struct.pack("<I", len(final_state)) + final_state)
+        self.file.close()
+
+
+class Recording:
+    """A recording file read back into memory."""
+
+    def __init__(self, path):
+        import pygame
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            magic, version, self.seed = HEADER.unpack_from(data)
+            # Version 2 recordings are version 3 without composition events
+            if magic != REPLAY_MAGIC or version not in (2, REPLAY_VERSION):
+                raise ReplayError(f"{path} is not a version {REPLAY_VERSION} EcoQuest recording")
+            offset = HEADER.size
+            self.initial_state, offset = self._blob(data, offset)
+            self.frames = {}
+            self.final_frame = None
+            self.final_state = None
+            while offset < len(data):
+                tag, frame = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if tag == TAG_END:
+                    self.final_frame = frame
+                    self.final_state, offset = self._blob(data, offset)
+                    break
+                if tag == TAG_QUIT:
+                    event = pygame.event.Event(pygame.QUIT)
+                elif tag == TAG_KEYDOWN:
+                    key, mod = KEY.unpack_from(data, offset)
+                    offset += KEY.size
+                    length = data[offset]
+                    text = data[offset + 1:offset + 1 + length].decode("utf-8")
+                    offset += 1 + length
+                    event = pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode=text)
+                elif tag in (TAG_MOUSEBUTTONDOWN, TAG_MOUSEBUTTONUP):
+                    x, y, button = MOUSE.unpack_from(data, offset)
+                    offset += MOUSE.size
+                    event_type = pygame.MOUSEBUTTONDOWN if tag == TAG_MOUSEBUTTONDOWN else pygame.MOUSEBUTTONUP
+                    event = pygame.event.Event(event_type, pos=(x, y), button=button)
+                elif tag in (TAG_TEXTINPUT, TAG_TEXTEDITING):
+                    length = data[offset]
+                    text = data[offset + 1:offset + 1 + length].decode("utf-8")
+                    offset += 1 + length
+                    if tag == TAG_TEXTINPUT:
+                        event = pygame.event.Event(pygame.TEXTINPUT, text=text)
+                    else:
+                        event = pygame.event.Event(pygame.TEXTEDITING, text=text, start=len(text), length=0)
+                else:
+                    raise ReplayError(f"unknown record tag {tag}")
+                self.frames.setdefault(frame, []).append(event)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ReplayError(f"{path} is truncated or corrupt") from e
+
+    @staticmethod
+    def _blob(data, offset):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        return data[offset:offset + length], offset + length
+
+
+class LiveEvents:
+    """Event source for normal play; optionally records what it returns.
+
+    transform (e.g. Display.map_events) is applied before recording, so a
+    recording holds logical canvas coordinates whatever the window size was.
+    """
+
+    def __init__(self, recorder=None, transform=None):
+        self.recorder = recorder
+        self.transform = transform
+        self.frame = 0
+
+    def get(self):
+        import pygame
+        return self._deliver(pygame.event.get())
+
+    def wait(self, timeout):
+        """Like get(), but block for up to `timeout` ms until there is input."""
+        import pygame
+        first = pygame.event.wait(timeout)
+        events = pygame.event.get()
+        if first.type != pygame.NOEVENT:
+            events.insert(0, first)
+        return self._deliver(events)
+
+    def _deliver(self, events):
+        if self.transform:
+            events = self.transform(events)
+        if self.recorder and events:
+            self.recorder.record(self.frame, events)
+        self.frame += 1
+        return events
+
+
+class ReplayEvents:
+    """Event source that plays a Recording back frame by frame."""
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.frame = 0
+        self.last_frame = max(recording.frames, default=0)
+        if recording.final_frame is not None:
+            self.last_frame = max(self.last_frame, recording.final_frame)
+
+    def get(self):
+        if self.frame > self.last_frame:
+            raise ReplayFinished()
+        events = self.recording.frames.get(self.frame, [])
+        self.frame += 1
+        return events
+
+    def wait(self, timeout):
+        return self.get()
+
+
+def replay(path):
+    """Replay a recording headless and return (game, frames, seconds)."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import game as eco
+    import savestate
+
+    recording = Recording(path)
+    events = ReplayEvents(recording)
+    session = eco.EcoQuestGame(seed=recording.seed, events=events, headless=True, save_path=None)
+    savestate.restore(session, recording.initial_state)
+    started = time.perf_counter()
+    try:
+        session.run()
+    except (ReplayFinished, SystemExit):
+        pass
+    elapsed = time.perf_counter() - started
+    if recording.final_state is not None:
+        final_state = savestate.snapshot(session)
+        if final_state != recording.final_state:
+            raise ReplayMismatch(f"replay of {path} diverged from the recorded end state "
+                                 f"(level {session.level}, exp {session.exp}, score {session.player_score})")
+    return session, events.frame, elapsed
+
+
+def main(argv):
+    if len(argv) != 2:
+        print("usage: python replay.py RECORDING")
+        return 2
+    session, frames, elapsed = replay(argv[1])
+    print(f"Replayed {frames} frames in {elapsed:.3f}s: level {session.level}, "
+          f"exp {session.exp}, score {session.player_score}, health {session.environment_health:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
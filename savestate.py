@@ -0,0 +1,262 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from economy import Economy
+
+
+# File layout: header (magic, format version, CRC32 of the payload) followed
+# by the zlib-compressed payload. Bump SAVE_VERSION when the payload changes
+# and keep a reader for every older version.
+SAVE_MAGIC = b"EQSV"
+SAVE_VERSION = 3
+HEADER = struct.Struct("<4sHI")
+STATE = struct.Struct("<Hiid")
+
+
+class SaveError(Exception):
+    """Raised when a save file is truncated, corrupt or from an unknown version."""
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(struct.pack(fmt, *values))
+
+    def string(self, text):
+        data = text.encode("utf-8")
+        self.pack("<H", len(data))
+        self.parts.append(data)
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def string(self):
+        (length,) = self.unpack("<H")
+        text = self.data[self.offset:self.offset + length].decode("utf-8")
+        self.offset += length
+        return text
+
+    def array(self, dtype, shape):
+        count = int(np.prod(shape))
+        array = np.frombuffer(self.data, dtype, count, self.offset).reshape(shape)
+        self.offset += array.nbytes
+        return array
+
+
+def _write_quests(writer, quests):
+    writer.pack("<H", len(quests))
+    for quest in quests:
+        writer.string(quest["task"])
+        writer.pack("<i?", quest["reward"], quest["completed"])
+        writer.string(quest.get("minigame", ""))
+
+
+def _read_quests(reader):
+    quests = []
+    (count,) = reader.unpack("<H")
+    for _ in range(count):
+        quest = {"task": reader.string()}
+        quest["reward"], quest["completed"] = reader.unpack("<i?")
+        minigame = reader.string()
+        if minigame:
+            quest["minigame"] = minigame
+        quests.append(quest)
+    return quests
+
+
+def snapshot(game):
+    """Serialize the persistent state of an EcoQuestGame to bytes."""
+    return pack(state_bytes(game))
+
+
+def state_bytes(game):
+    """The uncompressed snapshot payload: cheap to build, for pack() to finish later."""
+    writer = _Writer()
+    writer.parts.append(STATE.pack(game.level, game.exp, game.player_score, game.environment_health))
+    writer.string(game.current_environment_name)
+    writer.string(game.quest_message)
+    _write_quests(writer, game.current_quests)
+    _write_quests(writer, game.completed_quests)
+    writer.pack("<H", len(game.gloabe_data_entries))
+    for entry in game.gloabe_data_entries:
+        writer.string(entry["type"])
+        writer.pack("<i", entry["value"])
+        writer.string(entry["location"])
+    # Version 2: the regional environment arrays, shape (biomes, rows, cols)
+    # Version 3: the hotspot emission array too, as the session seed is not saved
+    health, pollution, emission = game.environment.state()
+    writer.pack("<BHH", *health.shape)
+    writer.parts.append(health.astype("<f4").tobytes())
+    writer.parts.append(pollution.astype("<f4").tobytes())
+    writer.parts.append(emission.astype("<f4").tobytes())
+    return writer.getvalue()
+
+
+def pack(state):
+    """Compress a state_bytes() payload into save file contents."""
+    payload = zlib.compress(state)
+    return HEADER.pack(SAVE_MAGIC, SAVE_VERSION, zlib.crc32(payload)) + payload
+
+
+def restore(game, data):
+    """Apply bytes produced by snapshot() to an EcoQuestGame."""
+    try:
+        magic, version, crc = HEADER.unpack_from(data)
+    except struct.error as e:
+        raise SaveError("save file is truncated") from e
+    if magic != SAVE_MAGIC:
+        raise SaveError("not an EcoQuest save file")
+    if version not in (1, 2, SAVE_VERSION):
+        raise SaveError(f"unsupported save version {version}")
+    payload = data[HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise SaveError("save file is corrupt")
+    try:
+        reader = _Reader(zlib.decompress(payload))
+        level, exp, score, health = reader.unpack(STATE.format)
+        environment_name = reader.string()
+        quest_message = reader.string()
+        current_quests = _read_quests(reader)
+        completed_quests = _read_quests(reader)
+        globe_data = []
+        (count,) = reader.unpack("<H")
+        for _ in range(count):
+            entry = {"type": reader.string()}
+            (entry["value"],) = reader.unpack("<i")
+            entry["location"] = reader.string()
+            globe_data.append(entry)
+        environment = None
+        if version >= 2:
+            shape = reader.unpack("<BHH")
+            environment = reader.array("<f4", shape), reader.array("<f4", shape)
+            if version >= 3:
+                environment += (reader.array("<f4", shape),)
+    except (struct.error, zlib.error, UnicodeDecodeError, ValueError) as e:
+        raise SaveError("save file is corrupt") from e
+
+    if environment is not None:
+        try:
+            game.environment.load_state(*environment)
+        except ValueError as e:
+            raise SaveError(str(e)) from e
+    game.level = level
+    game.exp = exp
+    game.level_up_exp = Economy().level_up_exp(level)
+    game.player_score = score
+    game.current_environment_name = environment_name
+    if environment is None:
+        # Version 1 saves only have the aggregate health of the current environment
+        game.environment_health = health
+    game.quest_message = quest_message
+    game.current_quests = current_quests
+    game.completed_quests = completed_quests
+    game.gloabe_data_entries = globe_data
+
+
+def write_file(path, data):
+    """Atomically replace path with data, so an interrupted write never loses the old save."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_file(path):
+    """Return the contents of a save file, or None if there is none."""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def delete_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Autosaver(threading.Thread):
+    """Writes snapshots to disk on a background thread.
+
+    tick() is called from the frame loop; once every `interval` seconds it
+    copies the state out uncompressed (state_bytes(), about 37 KB with the
+    environment arrays) and, if it differs from the last save, hands it to
+    the writer thread. The environment changes every frame of play, so in
+    practice every interval writes a full save (12-15 KB compressed);
+    only an idle game, e.g. one left in a mini-game, skips writes.
+    Compression, the disk write and fsync never run on the main thread.
+    """
+
+    def __init__(self, path, interval=30.0):
+        super().__init__(name="autosave", daemon=True)
+        self.path = path
+        self.interval = interval
+        self._pending = queue.Queue(maxsize=1)
+        self._last_saved = None
+        self._next_save = time.monotonic() + interval
+
+    def tick(self, game):
+        now = time.monotonic()
+        if self.interval <= 0 or now < self._next_save:
+            return
+        self._next_save = now + self.interval
+        self.submit(state_bytes(game))
+
+    def submit(self, state):
+        """Queue a state_bytes() payload for writing, unless it is the one last saved."""
+        if state == self._last_saved:
+            return
+        self._last_saved = state
+        self._drop_pending()  # only the newest snapshot matters
+        self._pending.put(state)
+
+    def _drop_pending(self):
+        try:
+            self._pending.get_nowait()
+        except queue.Empty:
+            return
+        self._pending.task_done()
+
+    def run(self):
+        while True:
+            data = self._pending.get()
+            try:
+                if data is None:
+                    break
+                write_file(self.path, pack(data))
+            except OSError as e:
+                print(f"Autosave failed: {e}")
+            finally:
+                self._pending.task_done()
+
+    def flush(self, game):
+        """Save the current state now and wait until it is on disk."""
+        self.submit(state_bytes(game))
+        self._pending.join()
+
+    def stop(self):
+        """Let any pending write finish, then end the thread."""
+        self._pending.put(None)
@@ -0,0 +1,356 @@
+"""Headless batch simulator for tuning the EcoQuest economy.
+
+Runs many simulated sessions across all cores with a pluggable player
+policy and prints a report on time-to-level, game-over rate and score
+distribution. It plays by the rules in economy.py without pygame, skipping
+ahead between player actions instead of stepping every frame. The regional
+environment model is followed through its mean pollution per biome, which
+sets the effective health decay (see _health_loss).
+
+    python simulate.py --sessions 10000 --policy casual
+    python simulate.py --set heal_amount=30,50,70 --set health_decay=0.05,0.1
+    python simulate.py --policy mypolicies:SpeedRunner --json report.json
+"""
+import argparse
+import importlib
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from economy import FPS, Economy, eligible_mini_games, environment_for_level
+
+
+class Session:
+    """State of one simulated play session."""
+
+    def __init__(self, economy):
+        self.economy = economy
+        self.frame = 0
+        self.level = 0
+        self.exp = 0
+        self.level_up_exp = economy.level_up_exp(0)
+        self.score = 0
+        self.health = economy.max_health
+        # Mean pollution of each biome's regions
+        start = sum(economy.initial_pollution) / 2
+        self.pollution = {environment_for_level(level): start for level in (0, 3, 6)}
+        self.quests = []
+        self.level_frames = [0]
+        self.game_over = False
+        self.finished = False
+
+    @property
+    def environment(self):
+        return environment_for_level(self.level)
+
+
+class Policy:
+    """Decides what a simulated player does next. Subclass to add players.
+
+    next_action() returns ("collect" | "mini_game" | "quest", frames to wait
+    before doing it). A mini-game attempt is won with probability `skill`
+    and takes attempt_frames() frames of play.
+    """
+
+    skill = 0.8
+
+    def next_action(self, session, rng):
+        raise NotImplementedError
+
+    def attempt_frames(self, mini_game, rng):
+        return int(rng.uniform(5, 20) * FPS)
+
+
+class CasualPlayer(Policy):
+    """Mixes collecting, mini-games and quests with long pauses."""
+
+    skill = 0.7
+
+    def next_action(self, session, rng):
+        action = rng.choices(["collect", "mini_game", "quest"], weights=[5, 3, 2])[0]
+        return action, int(rng.expovariate(1 / 4) * FPS)
+
+
+class Grinder(Policy):
+    """Mashes SPACE to collect items as fast as possible."""
+
+    def next_action(self, session, rng):
+        return "collect", rng.randint(6, 15)
+
+
+class QuestRunner(Policy):
+    """Works through the quest line and nothing else."""
+
+    skill = 0.9
+
+    def next_action(self, session, rng):
+        return "quest", int(rng.uniform(1, 3) * FPS)
+
+
+POLICIES = {"casual": CasualPlayer, "grinder": Grinder, "quester": QuestRunner}
+
+
+def load_policy(name):
+    """A built-in policy name, or "module:Class" for a policy defined elsewhere."""
+    if name in POLICIES:
+        return POLICIES[name]()
+    module_name, _, class_name = name.partition(":")
+    if not class_name:
+        raise ValueError(f"unknown policy {name!r}; use one of {sorted(POLICIES)} or module:Class")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _gain_exp(session, exp):
+    session.exp += exp
+    if session.exp >= session.level_up_exp:
+        _level_up(session)
+
+
+def _level_up(session):
+    session.level += 1
+    session.exp = 0
+    session.level_up_exp = session.economy.level_up_exp(session.level)
+    session.level_frames.append(session.frame)
+    _heal(session)
+    session.quests = session.economy.quests_for_level(session.level)
+
+
+def _heal(session):
+    session.health = session.economy.healed(session.health)
+
+
+def _health_loss(economy, pollution, frames):
+    """Health a biome loses over frames of the main loop, and its mean pollution afterwards.
+
+    EnvironmentModel.step() in closed form for the biome's mean: diffusion
+    moves pollution between regions without changing the mean, hotspots add
+    their average emission and dissipation removes a share, so the mean
+    approaches emission * (1 - dissipation) / dissipation geometrically.
+    Damage is linear in pollution, so the mean gives the mean health lost.
+    Hotspots that would pass 1 are clipped in the game and not here, so this
+    slightly overstates pollution.
+    """
+    emission = economy.hotspot_share * sum(economy.hotspot_emission) / 2
+    keep = 1.0 - economy.pollution_dissipation
+    if keep < 1.0:
+        settled = emission * keep / (1.0 - keep)
+        remaining = keep ** frames
+        total = settled * frames + (pollution - settled) * keep * (1.0 - remaining) / (1.0 - keep)
+        after = settled + (pollution - settled) * remaining
+    else:
+        total = pollution * frames + emission * frames * (frames + 1) / 2
+        after = pollution + emission * frames
+    return economy.health_decay * (frames + economy.pollution_damage * total), min(after, 1.0)
+
+
+def _wait(session, frames):
+    """Let frames pass in the main loop, decaying environment health."""
+    economy = session.economy
+    environment = session.environment
+    loss, pollution = _health_loss(economy, session.pollution[environment], frames)
+    if not session.quests and session.level % 3 == 0:
+        # update() keeps health topped up until the first quest is started
+        session.health = economy.max_health
+        session.pollution[environment] = pollution
+        session.frame += frames
+        return
+    if loss >= session.health:
+        # The frame health runs out on
+        low, high = 0, frames
+        while high - low > 1:
+            middle = (low + high) // 2
+            if _health_loss(economy, session.pollution[environment], middle)[0] >= session.health:
+                high = middle
+            else:
+                low = middle
+        session.frame += high
+        session.health = 0
+        session.game_over = True
+        return
+    session.health -= loss
+    session.pollution[environment] = pollution
+    session.frame += frames
+
+
+def _play_mini_game(session, policy, mini_game, rng):
+    """One attempt at a mini-game; the main loop (and health decay) is paused meanwhile."""
+    session.frame += policy.attempt_frames(mini_game, rng)
+    if rng.random() >= policy.skill:
+        return False
+    score, exp = session.economy.mini_game_rewards[mini_game]
+    session.score += score
+    _heal(session)
+    _gain_exp(session, exp)
+    return True
+
+
+def _do_quest(session, policy, rng, max_frames):
+    economy = session.economy
+    if not session.quests:
+        session.quests = economy.quests_for_level(session.level)
+        return
+    quest = session.quests[0]
+    mini_game, wins_needed = economy.quest_mini_games[quest["task"]]
+    wins = 0
+    while wins < wins_needed:
+        if session.frame >= max_frames:
+            return
+        if _play_mini_game(session, policy, mini_game, rng):
+            wins += 1
+    session.score += quest["reward"]
+    session.pollution[session.environment] *= 1.0 - economy.quest_clean_up
+    if quest["task"] == economy.final_quest:
+        session.finished = True
+        return
+    if session.quests and session.quests[0] is quest:
+        session.quests.pop(0)
+    session.exp += economy.quest_exp[quest["task"]]
+    if economy.quest_levels_up(quest["task"], session.exp, session.level_up_exp):
+        _level_up(session)
+
+
+def simulate_session(economy, policy, seed, max_frames):
+    """Play one session and return (score, final level, game over, finished, frames, level-up frames)."""
+    rng = random.Random(seed)
+    session = Session(economy)
+    while not (session.game_over or session.finished) and session.frame < max_frames:
+        action, wait = policy.next_action(session, rng)
+        _wait(session, max(wait, 1))
+        if session.game_over:
+            break
+        if action == "collect":
+            points = rng.randint(*economy.collect_points)
+            session.score += points
+            _gain_exp(session, points)
+        elif action == "mini_game":
+            _play_mini_game(session, policy, rng.choice(eligible_mini_games(session.level)), rng)
+        elif action == "quest":
+            _do_quest(session, policy, rng, max_frames)
+    return (session.score, session.level, session.game_over, session.finished,
+            min(session.frame, max_frames), session.level_frames)
+
+
+def _run_chunk(overrides, policy_name, seeds, max_frames):
+    economy = Economy(**overrides)
+    policy = load_policy(policy_name)
+    return [simulate_session(economy, policy, seed, max_frames) for seed in seeds]
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(results):
+    """Aggregate per-session results into the report dictionary."""
+    scores = [r[0] for r in results]
+    levels = [r[1] for r in results]
+    report = {
+        "sessions": len(results),
+        "game_over_rate": sum(r[2] for r in results) / len(results),
+        "finish_rate": sum(r[3] for r in results) / len(results),
+        "mean_session_seconds": statistics.fmean(r[4] for r in results) / FPS,
+        "mean_final_level": statistics.fmean(levels),
+        "score": {
+            "mean": statistics.fmean(scores),
+            "p10": _percentile(scores, 0.1),
+            "p50": _percentile(scores, 0.5),
+            "p90": _percentile(scores, 0.9),
+            "max": max(scores),
+        },
+        "time_to_level": {},
+    }
+    for level in range(1, max(levels) + 1):
+        times = [r[5][level] / FPS for r in results if len(r[5]) > level]
+        report["time_to_level"][level] = {
+            "reached": len(times) / len(results),
+            "median_seconds": _percentile(times, 0.5),
+            "p90_seconds": _percentile(times, 0.9),
+        }
+    return report
+
+
+def run_batch(sessions, policy_name="casual", overrides=None, seed=0, max_minutes=30,
+              workers=None, chunk_size=250, executor=None):
+    """Simulate `sessions` sessions in parallel and return the summary report."""
+    overrides = overrides or {}
+    Economy(**overrides)  # fail fast on a bad setting name
+    load_policy(policy_name)
+    max_frames = int(max_minutes * 60 * FPS)
+    seeds = [seed * 1_000_003 + i for i in range(sessions)]
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [executor.submit(_run_chunk, overrides, policy_name, chunk, max_frames) for chunk in chunks]
+        results = [result for future in futures for result in future.result()]
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return summarize(results)
+
+
+def parse_settings(pairs):
+    """Turn ["heal_amount=30,50", ...] into a list of override dicts covering every combination."""
+    axes = []
+    for pair in pairs:
+        name, _, values = pair.partition("=")
+        if not values:
+            raise ValueError(f"expected name=value[,value...], got {pair!r}")
+        axes.append([(name, json.loads(value)) for value in values.split(",")])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def format_report(report, overrides):
+    label = ", ".join(f"{k}={v}" for k, v in overrides.items()) or "defaults"
+    score = report["score"]
+    lines = [
+        f"== {label} ==",
+        f"sessions: {report['sessions']}  game over: {report['game_over_rate']:.1%}  "
+        f"finished: {report['finish_rate']:.1%}  mean final level: {report['mean_final_level']:.2f}",
+        f"score mean {score['mean']:.0f}  p10 {score['p10']}  p50 {score['p50']}  "
+        f"p90 {score['p90']}  max {score['max']}",
+    ]
+    for level, stats in report["time_to_level"].items():
+        lines.append(f"  level {level}: reached {stats['reached']:.1%}  median {stats['median_seconds']:.0f}s  "
+                     f"p90 {stats['p90_seconds']:.0f}s")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-simulate EcoQuest sessions to tune the economy.")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--policy", default="casual", help=f"one of {sorted(POLICIES)} or module:Class")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=V1,V2",
+                        help="economy override; repeat and list values to sweep a grid")
+    parser.add_argument("--minutes", type=float, default=30, help="session length cap in minutes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="also write the reports as JSON")
+    args = parser.parse_args(argv)
+
+    reports = []
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as executor:
+        for overrides in parse_settings(args.set):
+            report = run_batch(args.sessions, args.policy, overrides, args.seed, args.minutes,
+                               executor=executor)
+            print(format_report(report, overrides))
+            reports.append({"settings": overrides, "policy": args.policy, "report": report})
+    print(f"simulated {args.sessions * len(reports)} sessions in {time.perf_counter() - started:.1f}s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Optional online sync between kiosks and a shared EcoQuest server.
+
+The protocol is newline-delimited JSON over long-lived TCP connections
+(see sync_server.py for the reference server). Each request carries a
+batch of operations and gets one response with a result per operation:
+
+    {"ops": [{"op": "submit", "scores": [...]}, {"op": "top", "n": 10}, {"op": "challenges"}]}
+    {"results": [{"accepted": 2}, {"scores": [...]}, {"challenges": [...]}]}
+
+SyncClient runs all network work on its own asyncio event loop in a
+background thread. The game only calls non-blocking methods: scores are
+queued and sent in one batch per sync interval, and the last shared
+leaderboard and challenge list are read from attributes. When the server
+is unreachable the game keeps its local data and the client retries with
+backoff; queued scores are kept until they are delivered.
+"""
+import asyncio
+import json
+import threading
+
+
+DEFAULT_PORT = 8765
+
+
+def parse_address(address):
+    """"host:port" or "host" -> (host, port)."""
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, DEFAULT_PORT
+    return host, int(port)
+
+
+class SyncError(Exception):
+    """Raised inside the sync loop when a request fails."""
+
+
+class ConnectionPool:
+    """Up to `size` open connections to one server, reused across requests."""
+
+    def __init__(self, host, port, size=2, timeout=3.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._slots = None
+
+    async def request(self, message):
+        """Send one JSON message and return the decoded reply.
+
+        A pooled connection the server has since closed is only noticed when
+        it is used, so a request that fails on a reused connection is retried
+        once on a fresh one.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        data = json.dumps(message).encode("utf-8") + b"\n"
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await self._connect()
+                try:
+                    writer.write(data)
+                    await asyncio.wait_for(writer.drain(), self.timeout)
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if not line:
+                        raise SyncError("server closed the connection")
+                    reply = json.loads(line)
+                except (OSError, SyncError) as e:
+                    writer.close()
+                    if reused:
+                        continue
+                    raise SyncError(str(e)) from e
+                except BaseException:
+                    writer.close()
+                    raise
+                self._idle.append((reader, writer))
+                return reply
+
+    async def _connect(self):
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class SyncClient(threading.Thread):
+    """Background sync of scores, the shared top-N and community challenges.
+
+    submit_score() may be called from the frame loop at any rate; scores
+    are merged per player (best score wins) and sent every `interval`
+    seconds. top_scores and challenges hold the last lists pulled from the
+    server, or None until the first successful sync.
+    """
+
+    def __init__(self, address, kiosk, interval=15.0, top_n=10, pool_size=2, timeout=3.0,
+                 max_backoff=300.0):
+        super().__init__(name="sync", daemon=True)
+        self.host, self.port = parse_address(address)
+        self.kiosk = kiosk
+        self.interval = interval
+        self.top_n = top_n
+        self.max_backoff = max_backoff
+        self.online = False
+        self.top_scores = None
+        self.challenges = None
+        self._pool = ConnectionPool(self.host, self.port, pool_size, timeout)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._wake = None
+        self._stopping = False
+
+    def submit_score(self, name, score):
+        """Queue a player's score for the next batch; never blocks."""
+        with self._lock:
+            if score > self._pending.get(name, float("-inf")):
+                self._pending[name] = score
+        # A large backlog (e.g. many players between syncs) is sent right away
+        if self._wake is not None and len(self._pending) >= 50 and self.is_alive():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._pool.close()
+            self._loop.close()
+
+    async def _main(self):
+        self._wake = asyncio.Event()
+        delay = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            stopping = self._stopping
+            try:
+                await self.sync_once()
+            except (OSError, asyncio.TimeoutError, SyncError, ValueError, KeyError, TypeError) as e:
+                if self.online:
+                    print(f"Sync server unreachable: {e}")
+                self.online = False
+                delay = min(max(delay * 2, self.interval), self.max_backoff)
+            else:
+                self.online = True
+                delay = self.interval
+            if stopping:
+                return
+
+    async def sync_once(self):
+        """Send queued scores and pull the shared lists in one batched request."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        ops = []
+        if batch:
+            ops.append({"op": "submit", "kiosk": self.kiosk,
+                        "scores": [{"name": name, "score": score} for name, score in batch.items()]})
+        ops.append({"op": "top", "n": self.top_n})
+        ops.append({"op": "challenges"})
+        try:
+            reply = await self._pool.request({"ops": ops})
+            results = reply.get("results")
+            if not isinstance(results, list) or len(results) != len(ops):
+                raise SyncError(reply.get("error", "malformed reply"))
+        except BaseException:
+            # Undelivered scores go back in the queue for the next attempt
+            with self._lock:
+                for name, score in batch.items():
+                    if score > self._pending.get(name, float("-inf")):
+                        self._pending[name] = score
+            raise
+        self.top_scores = [(entry["name"], entry["score"]) for entry in results[-2]["scores"]]
+        self.challenges = [{"challenge": text} for text in results[-1]["challenges"]]
+
+    def stop(self, timeout=2.0):
+        """Try one last sync of queued scores, then end the thread."""
+        if not self.is_alive():
+            return
+        self._stopping = True
+        if self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        self.join(timeout)
@@ -0,0 +1,158 @@
+"""Reference sync server for EcoQuest kiosks (see sync.py for the protocol).
+
+Run it locally:  python sync_server.py [--host 127.0.0.1] [--port 8765] [--data sync_data.json]
+Point kiosks at it:  ECOQUEST_SYNC=127.0.0.1:8765 python game.py
+
+One asyncio task per kiosk connection serves batched requests; the shared
+leaderboard keeps each player's best score and is written to the data file
+a few seconds after it changes. Community challenges are read from the same
+file, so they can be edited there while the server is stopped.
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import os
+import signal
+import sys
+
+from sync import DEFAULT_PORT
+
+
+DEFAULT_CHALLENGES = [
+    "Reduce plastic waste by collecting litter in your area!",
+    "Plant trees in your local park!",
+    "Organize a local cleanup event!",
+    "Donate to local charities!",
+]
+MAX_TOP = 100
+MAX_LINE = 1 << 20
+
+
+class SyncServer:
+    def __init__(self, data_path=None, save_delay=5.0):
+        self.data_path = data_path
+        self.save_delay = save_delay
+        self.scores = {}
+        self.challenges = list(DEFAULT_CHALLENGES)
+        self._top = None
+        self._save_task = None
+        self.load()
+
+    def load(self):
+        if not self.data_path:
+            return
+        try:
+            with open(self.data_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        self.scores = data.get("scores", {})
+        self.challenges = data.get("challenges", self.challenges)
+
+    def save(self):
+        if not self.data_path:
+            return
+        tmp_path = f"{self.data_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"scores": self.scores, "challenges": self.challenges}, f)
+        os.replace(tmp_path, self.data_path)
+
+    def submit(self, kiosk, scores):
+        accepted = 0
+        for entry in scores:
+            name, score = str(entry["name"])[:40], entry["score"]
+            if not isinstance(score, (int, float)) or isinstance(score, bool):
+                continue
+            best = self.scores.get(name)
+            if best is None or score > best["score"]:
+                self.scores[name] = {"score": score, "kiosk": str(kiosk)}
+                self._top = None
+                accepted += 1
+        if accepted:
+            self._schedule_save()
+        return {"accepted": accepted}
+
+    def top(self, n):
+        n = max(0, min(int(n), MAX_TOP))
+        if self._top is None:
+            # Kept sorted until the next accepted score; most requests are reads
+            best = heapq.nlargest(MAX_TOP, self.scores.items(), key=lambda item: item[1]["score"])
+            self._top = [{"name": name, "score": entry["score"], "kiosk": entry["kiosk"]} for name, entry in best]
+        return {"scores": self._top[:n]}
+
+    def handle(self, request):
+        results = []
+        for op in request["ops"]:
+            kind = op.get("op")
+            if kind == "submit":
+                results.append(self.submit(op.get("kiosk", ""), op.get("scores", [])))
+            elif kind == "top":
+                results.append(self.top(op.get("n", 10)))
+            elif kind == "challenges":
+                results.append({"challenges": self.challenges})
+            else:
+                results.append({"error": f"unknown op {kind!r}"})
+        return {"results": results}
+
+    def _schedule_save(self):
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self):
+        await asyncio.sleep(self.save_delay)
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save {self.data_path}: {e}")
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    reply = {"error": f"bad request: {e}"}
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (OSError, ValueError, asyncio.LimitOverrunError, asyncio.CancelledError):
+            pass  # client gone, oversized request, or server shutting down
+        finally:
+            writer.close()
+
+
+async def serve(host, port, data_path):
+    server = SyncServer(data_path)
+    listener = await asyncio.start_server(server.serve_connection, host, port, limit=MAX_LINE)
+    print(f"EcoQuest sync server on {host}:{port} ({len(server.scores)} players)")
+    stopped = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, stopped.set)
+        except (NotImplementedError, RuntimeError):  # Windows: Ctrl+C raises KeyboardInterrupt
+            pass
+    try:
+        async with listener:
+            await stopped.wait()
+    finally:
+        server.save()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Reference sync server for EcoQuest kiosks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data", default="sync_data.json", help="leaderboard and challenges file")
+    args = parser.parse_args(argv[1:])
+    try:
+        asyncio.run(serve(args.host, args.port, args.data))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
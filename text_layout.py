@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+import pygame
+
+
+_fonts = {}
+
+
+def get_font(size, name=None):
+    """A shared Font for (name, size); pygame fonts are slow to create every frame."""
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.Font(name, size)
+    return font
+
+
+def wrap_lines(text, font, width):
+    """Split text into lines that fit `width` pixels, honouring explicit newlines."""
+    lines = []
+    for paragraph in text.split("\n"):
+        words = paragraph.split()
+        if not words:
+            lines.append("")
+            continue
+        line = ""
+        for word in words:
+            candidate = f"{line} {word}" if line else word
+            if font.size(candidate)[0] <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # A single word wider than the block is broken where it overflows
+            while font.size(word)[0] > width and len(word) > 1:
+                cut = len(word) - 1
+                while cut > 1 and font.size(word[:cut])[0] > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+class TextLayout:
+    """Word-wrapped, multi-line text blocks, laid out and rendered once.
+
+    render() returns a surface for the whole block, optionally on a
+    background panel. Blocks are cached by everything that affects their
+    pixels (text, font, width, colours, alignment, padding), so a popup or
+    quest message redrawn every frame costs one dictionary lookup after the
+    first frame. The least recently used blocks are dropped past `capacity`.
+    """
+
+    def __init__(self, capacity=128):
+        self.capacity = capacity
+        self._blocks = OrderedDict()
+
+    def render(self, text, size, width, color, align="left", background=None, padding=0,
+               font_name=None, line_spacing=4):
+        key = (text, font_name, size, width, color, align, background, padding, line_spacing)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+        block = self._layout(text, get_font(size, font_name), width, color, align, background,
+                             padding, line_spacing)
+        self._blocks[key] = block
+        if len(self._blocks) > self.capacity:
+            self._blocks.popitem(last=False)
+        return block
+
+    def _layout(self, text, font, width, color, align, background, padding, line_spacing):
+        inner = max(1, width - 2 * padding)
+        lines = [font.render(line, True, color) for line in wrap_lines(text, font, inner)]
+        line_height = font.get_linesize() + line_spacing
+        content_width = max((line.get_width() for line in lines), default=0)
+        # Panels span the full block width; bare text shrinks to fit
+        block_width = width if background is not None else content_width + 2 * padding
+        block_height = max(1, line_height * len(lines) - line_spacing + 2 * padding)
+        block = pygame.Surface((max(1, block_width), block_height), pygame.SRCALPHA)
+        if background is not None:
+            block.fill(background)
+        for index, line in enumerate(lines):
+            if align == "center":
+                x = (block_width - line.get_width()) // 2
+            elif align == "right":
+                x = block_width - padding - line.get_width()
+            else:
+                x = padding
+            block.blit(line, (x, padding + index * line_height))
+        if pygame.display.get_surface() is not None:
+            block = block.convert_alpha()
+        return block
+
+    def clear(self):
+        self._blocks.clear()
@@ -0,0 +1,132 @@
+import queue
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from assets import MEMORY, surface_bytes
+
+
+# Luma weights used to desaturate, and the smog colour polluted scenes drift towards
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+SMOG = np.array([110, 100, 80], dtype=np.float32)
+
+
+def tint_pixels(pixels, amount):
+    """Return a polluted version of an (w, h, 3) uint8 array; amount runs 0 (clean) to 1."""
+    rgb = pixels.astype(np.float32)
+    gray = rgb @ LUMA
+    rgb += (gray[..., None] - rgb) * (0.7 * amount)   # wash the colour out
+    rgb += (SMOG - rgb) * (0.35 * amount)             # haze over with smog
+    rgb *= 1.0 - 0.2 * amount                         # and darken
+    return np.clip(rgb, 0, 255).astype(np.uint8)
+
+
+class BackgroundTinter:
+    """Clean-to-polluted variants of the backgrounds, cached per health level.
+
+    Environment health is quantized into `levels` steps. Each (background,
+    level, size) variant is built once on a worker thread with
+    pygame.surfarray/NumPy, converted to the display format on the main
+    thread and kept in an LRU cache of `capacity` surfaces. background()
+    never computes pixels: on a miss it schedules the build and returns the
+    closest variant it already has, so a window resize or a health change
+    costs a cache lookup until the new variants are ready.
+
+    Variants are recorded in `ledger`; over its budget they are kept in
+    16-bit colour and the cache shrinks to one background's levels.
+    """
+
+    def __init__(self, images, levels=4, capacity=24, ledger=MEMORY):
+        self.images = images
+        self.levels = levels
+        self.capacity = capacity
+        self.ledger = ledger
+        self._cache = OrderedDict()
+        self._scheduled = set()
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="background-tinter", daemon=True)
+        self._worker.start()
+
+    def level_for(self, health, max_health):
+        """Pollution level 0 (clean) to levels - 1 for a health value."""
+        fraction = 1.0 - max(0.0, min(health, max_health)) / max_health
+        return min(self.levels - 1, int(fraction * self.levels))
+
+    def background(self, key, health, max_health, size):
+        """Background `key` tinted for `health` and sized to `size`, ready to blit."""
+        self.collect()
+        level = self.level_for(health, max_health)
+        surface = self._cache.get((key, level, size))
+        if surface is not None:
+            self._cache.move_to_end((key, level, size))
+            return surface
+        self._schedule(key, size)
+        for other in sorted(range(self.levels), key=lambda l: abs(l - level)):
+            surface = self._cache.get((key, other, size))
+            if surface is not None:
+                return surface
+        return self.images.sized(key, size)
+
+    def _schedule(self, key, size):
+        """Queue every level of a background at a size; the source is copied here, on the main thread."""
+        if (key, size) in self._scheduled:
+            return
+        self._scheduled.add((key, size))
+        source = self.images[key]
+        # A background reduced to 16-bit colour goes back to true colour (a copy) for smoothscale
+        self._jobs.put((key, size, source.convert(32) if source.get_bitsize() < 24 else source.copy()))
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            key, size, source = job
+            if source.get_size() != size:
+                source = pygame.transform.smoothscale(source, size)
+            pixels = pygame.surfarray.array3d(source)
+            for level in range(self.levels):
+                amount = level / max(self.levels - 1, 1)
+                surface = source if level == 0 else pygame.surfarray.make_surface(tint_pixels(pixels, amount))
+                self._done.put((key, level, size, surface))
+            self._done.put((key, None, size, None))
+
+    def collect(self):
+        """Adopt finished variants: convert them for fast blits and evict the least recently used."""
+        while True:
+            try:
+                key, level, size, surface = self._done.get_nowait()
+            except queue.Empty:
+                return
+            if level is None:
+                self._scheduled.discard((key, size))
+                continue
+            quality = "full"
+            if not self.ledger.fits(size[0] * size[1] * 4):
+                surface, quality = surface.convert(16), "16-bit"
+            elif pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self._cache[(key, level, size)] = surface
+            self._cache.move_to_end((key, level, size))
+            self.ledger.add("variant", self._name(key, level, size), surface_bytes(surface), asset=key,
+                            quality=quality)
+            while len(self._cache) > self.capacity or (len(self._cache) > self.levels and not self.ledger.fits(0)):
+                self._evict()
+
+    @staticmethod
+    def _name(key, level, size):
+        return f"{key}/{level}/{size[0]}x{size[1]}"
+
+    def _evict(self):
+        (key, level, size), _ = self._cache.popitem(last=False)
+        self.ledger.remove("variant", self._name(key, level, size))
+
+    def clear(self):
+        while self._cache:
+            self._evict()
+
+    def stop(self):
+        self._jobs.put(None)
@@ -0,0 +1,128 @@
+import pygame
+
+
+class TextInput:
+    """A one-line answer box drawn on the canvas.
+
+    Click the box to focus it, click elsewhere to leave it. While focused
+    it takes typed text (TEXTINPUT, so IME and non-Latin input work, with
+    the text being composed shown underlined at the cursor), backspace,
+    delete, the arrow keys, home and end; Enter submits.
+
+    handle() only changes state. draw() repaints the box when its text,
+    cursor or focus changed since the last draw and returns the canvas
+    rects it covered, so only those are pushed to the window; the rendered
+    text is kept until it changes.
+    """
+
+    def __init__(self, rect, font, background, color_active="dodgerblue2", color_inactive="lightskyblue3",
+                 min_width=200, max_length=40, to_window=None):
+        self.rect = pygame.Rect(rect)
+        self.font = font
+        self.background = background
+        self.color_active = pygame.Color(color_active)
+        self.color_inactive = pygame.Color(color_inactive)
+        self.min_width = min_width
+        self.max_length = max_length
+        # Maps a canvas rect to the window, to place the IME candidate list
+        self.to_window = to_window
+        self.text = ""
+        self.cursor = 0
+        self.composition = ""
+        self.focused = False
+        self._dirty = True
+        self._drawn = None
+        self._rendered = (None, None)
+
+    def focus(self, focused=True):
+        """Take or leave keyboard focus; text input (and any on-screen keyboard) is on only while focused."""
+        if focused == self.focused:
+            return
+        self.focused = focused
+        self.composition = ""
+        self._dirty = True
+        if focused:
+            pygame.key.start_text_input()
+            pygame.key.set_text_input_rect(self.to_window(self.rect) if self.to_window else self.rect)
+        else:
+            pygame.key.stop_text_input()
+
+    def _edit(self, text, cursor):
+        if (text, cursor) != (self.text, self.cursor):
+            self.text, self.cursor = text, cursor
+            self._dirty = True
+
+    def _index_at(self, x):
+        """The cursor position closest to canvas x."""
+        x -= self.rect.x + 5
+        widths = [self.font.size(self.text[:index])[0] for index in range(len(self.text) + 1)]
+        return min(range(len(widths)), key=lambda index: abs(widths[index] - x))
+
+    def handle(self, event, action):
+        """Apply an event and the action it is bound to (see controls.py).
+        Returns "submit" when the player enters their answer, otherwise None."""
+        if action == "click":
+            self.focus(self.rect.collidepoint(event.pos))
+            if self.focused:
+                self._edit(self.text, self._index_at(event.pos[0]))
+            return None
+        if not self.focused:
+            return None
+        text, cursor = self.text, self.cursor
+        if action == "submit":
+            return None if self.composition else "submit"
+        elif action == "type":
+            typed = event.text[:max(0, self.max_length - len(text))]
+            self.composition = ""
+            self._dirty = True
+            self._edit(text[:cursor] + typed + text[cursor:], cursor + len(typed))
+        elif action == "compose":
+            if event.text != self.composition:
+                self.composition = event.text
+                self._dirty = True
+        elif action == "erase" and cursor > 0:
+            self._edit(text[:cursor - 1] + text[cursor:], cursor - 1)
+        elif action == "delete":
+            self._edit(text[:cursor] + text[cursor + 1:], cursor)
+        elif action == "left":
+            self._edit(text, max(0, cursor - 1))
+        elif action == "right":
+            self._edit(text, min(len(text), cursor + 1))
+        elif action == "home":
+            self._edit(text, 0)
+        elif action == "end":
+            self._edit(text, len(text))
+        return None
+
+    def invalidate(self):
+        """Make the next draw() repaint the box, e.g. after the screen under it was redrawn."""
+        self._dirty = True
+
+    def draw(self, surface):
+        """Repaint the box on surface if it changed. Returns the rects to show (empty if none)."""
+        if not self._dirty:
+            return []
+        self._dirty = False
+        color = self.color_active if self.focused else self.color_inactive
+        shown = self.text[:self.cursor] + self.composition + self.text[self.cursor:]
+        if self._rendered[0] != (shown, color):
+            self._rendered = ((shown, color), self.font.render(shown, True, color))
+        rendered = self._rendered[1]
+
+        # The box grows with the text; what it covered before is cleared too
+        self.rect.w = max(self.min_width, rendered.get_width() + 10)
+        area = self.rect.union(self._drawn) if self._drawn else self.rect.copy()
+        surface.fill(self.background, area)
+        x, y = self.rect.x + 5, self.rect.y + 5
+        surface.blit(rendered, (x, y))
+        before = self.font.size(self.text[:self.cursor])[0]
+        if self.composition:
+            after = before + self.font.size(self.composition)[0]
+            bottom = y + rendered.get_height() - 1
+            pygame.draw.line(surface, color, (x + before, bottom), (x + after, bottom))
+            before = after
+        if self.focused:
+            pygame.draw.line(surface, color, (x + before, self.rect.y + 4), (x + before, self.rect.bottom - 5), 2)
+        pygame.draw.rect(surface, color, self.rect, 2)
+        self._drawn = self.rect.copy()
+        return [area]